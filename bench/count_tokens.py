@@ -1,60 +1,99 @@
-import json
-from transformers import AutoTokenizer
+import argparse
+import os
+from itertools import islice
 
-def analyze_alpaca_tokens(json_file):
-    # Load tokenizer
-    print("Loading Gemma tokenizer...")
-    tokenizer = AutoTokenizer.from_pretrained("google/gemma-3-27b-it")
+import ijson
+
+# Let the Rust tokenizer parallelize batched encodes across cores
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+GEMMA_TOKENIZER = "google/gemma-3-27b-it"
+TIKTOKEN_ENCODING = "cl100k_base"
+TOKENIZE_BATCH_SIZE = 1024  # Entries encoded per batched tokenizer call
+
+def entry_text(entry):
+    """Combine all fields of an Alpaca entry into the text that gets counted"""
+    # str() per field, as the f-string this replaced did for None or non-string values
+    return ' '.join(str(entry.get(field, '')) for field in ('instruction', 'input', 'output'))
+
+def load_token_counter(fast=False):
+    """
+    Return a function mapping a list of texts to their token counts.
     
-    # Load data
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    With fast=True, counts come from tiktoken's Rust BPE (much faster and
+    lighter to load), so the absolute numbers are approximations of what
+    the Gemma tokenizer would produce.
+    """
+    if fast:
+        import tiktoken
+        print(f"Loading tiktoken encoding '{TIKTOKEN_ENCODING}' (approximate counts)...")
+        enc = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+        return lambda texts: [len(ids) for ids in enc.encode_ordinary_batch(texts)]
     
-    print(f"Loaded {len(data)} entries\n")
+    from transformers import AutoTokenizer
+    print("Loading Gemma tokenizer...")
+    tokenizer = AutoTokenizer.from_pretrained(GEMMA_TOKENIZER)
+    return lambda texts: [
+        len(ids)
+        for ids in tokenizer(texts, add_special_tokens=False, return_attention_mask=False)['input_ids']
+    ]
+
+def analyze_alpaca_tokens(json_file, fast=False):
+    """
+    Print token statistics for an Alpaca-format JSON file.
     
-    # Concatenate all text and count tokens
-    all_text = []
+    Totals are sums over entries rather than a re-encode of the joined corpus,
+    so they omit the separator tokens a concatenation would add.
+    """
+    # Load tokenizer
+    count_tokens = load_token_counter(fast)
+    
+    # Stream entries off disk and tokenize them in fixed-size windows, so only
+    # one window of text is alive at a time
     token_counts = []
+    total_chars = 0
+    
+    with open(json_file, 'rb') as f:
+        entries = ijson.items(f, 'item')
+        while True:
+            window = list(islice(entries, TOKENIZE_BATCH_SIZE))
+            if not window:
+                break
+            
+            texts = list(map(entry_text, window))
+            total_chars += sum(len(text) for text in texts)
+            token_counts.extend(count_tokens(texts))
+            del window, texts
     
-    for entry in data:
-        instruction = entry.get('instruction', '')
-        input_text = entry.get('input', '')
-        output_text = entry.get('output', '')
-        
-        # Combine all fields for this entry
-        entry_text = f"{instruction} {input_text} {output_text}"
-        all_text.append(entry_text)
-        
-        # Count tokens for this entry
-        tokens = tokenizer.encode(entry_text, add_special_tokens=False)
-        token_counts.append(len(tokens))
-    
-    # Concatenate ALL text
-    concatenated_text = ' '.join(all_text)
-    total_tokens = len(tokenizer.encode(concatenated_text, add_special_tokens=False))
+    print(f"Loaded {len(token_counts)} entries\n")
+    total_tokens = sum(token_counts)
     
     # Calculate stats
-    avg_tokens = sum(token_counts) / len(token_counts)
+    avg_tokens = total_tokens / len(token_counts)
     min_tokens = min(token_counts)
     max_tokens = max(token_counts)
     
     # Print results
     print("🔢 TOKEN STATISTICS")
     print("-" * 30)
-    print(f"Total entries: {len(data):,}")
-    print(f"Total tokens (concatenated): {total_tokens:,}")
+    print(f"Total entries: {len(token_counts):,}")
+    print(f"Total tokens: {total_tokens:,}")
     print(f"Average tokens per entry: {avg_tokens:.1f}")
     print(f"Min tokens per entry: {min_tokens}")
     print(f"Max tokens per entry: {max_tokens}")
-    print(f"Total characters: {len(concatenated_text):,}")
-    print(f"Chars per token: {len(concatenated_text) / total_tokens:.2f}")
+    print(f"Total characters: {total_chars:,}")
+    print(f"Chars per token: {total_chars / total_tokens:.2f}")
 
 if __name__ == "__main__":
-    # Replace with your JSON file path
-    json_file = "dolphin_reasoner_thai.json"
+    parser = argparse.ArgumentParser(description="Token statistics for an Alpaca-format JSON file")
+    parser.add_argument("json_file", nargs="?", default="dolphin_reasoner_thai.json")
+    parser.add_argument("--fast", action="store_true",
+                        help=f"estimate counts with tiktoken ({TIKTOKEN_ENCODING}) instead of the Gemma tokenizer")
+    args = parser.parse_args()
+    json_file = args.json_file
     
     try:
-        analyze_alpaca_tokens(json_file)
+        analyze_alpaca_tokens(json_file, fast=args.fast)
     except FileNotFoundError:
         print(f"❌ File '{json_file}' not found!")
     except Exception as e:
@@ -1,13 +1,17 @@
-import requests
-import json
+import asyncio
+import aiohttp
+import orjson
 from datasets import load_dataset
-from tqdm import tqdm
+from tqdm.asyncio import tqdm
 import re
+import unicodedata
 
 VLLM_API_URL = "http://localhost:2124/v1/chat/completions"
 MODEL_NAME = "MonkeyReasoner"
 CONFIGS = ["onet", "ic", "tgat", "tpat1", "a_level"]
 OUTPUT_FILE = "reasoning_sft_merged.json"
+MAX_CONCURRENT_REQUESTS = 64  # In-flight requests, lets vLLM batch questions together
+KEEPALIVE_TIMEOUT = 120  # Seconds idle connections stay pooled, long enough to span dataset loads between configs
 SYSTEM_PROMPT = """
 คุณคือผู้ช่วยเหลือในการตอบคำถามแบบปรนัยภาษาไทย
 โปรดอ่านคำถามและตัวเลือกอย่างรอบคอบ แล้วให้คำตอบที่ถูกต้องที่สุด
@@ -21,6 +25,11 @@ D. 62.5
 E. 67.5
 คำตอบ: "<think>\nเนื่องจาก p, 1, p+3 เป็นลำดับเลขคณิต แสดงว่าผลต่างร่วม (d) มีค่าคงที่\nดังนั้น 1 - p = (p+3) - 1\n1 - p = p + 2\n2p = -1\np = -1/2\n\nดังนั้น ลำดับเลขคณิตคือ -1/2, 1, 3/2, ...\nผลต่างร่วม d = 1 - (-1/2) = 3/2\n\nผลบวก n พจน์แรกของลำดับเลขคณิต คือ Sn = n/2 * [2a + (n-1)d]\nเมื่อ a คือพจน์แรก และ d คือผลต่างร่วม\n\nในที่นี้ a = -1/2, d = 3/2, n = 10\nS10 = 10/2 * [2*(-1/2) + (10-1)*(3/2)]\nS10 = 5 * [-1 + 9*(3/2)]\nS10 = 5 * [-1 + 27/2]\nS10 = 5 * [-2/2 + 27/2]\nS10 = 5 * [25/2]\nS10 = 125/2\nS10 = 62.5\n</think>\n\n<SOLUTION>D</SOLUTION>"
 """
+# Byte-stable system prompt so vLLM's prefix cache can reuse its KV blocks across requests
+SYSTEM_PROMPT = unicodedata.normalize("NFC", SYSTEM_PROMPT.strip())
+
+SOLUTION_RE = re.compile(r"<SOLUTION>\s*([\s\S]*?)\s*</SOLUTION>", re.IGNORECASE)
+CHOICE_LETTER_RE = re.compile(r"[A-E]")
 
 def format_prompt(question, choices):
     prompt = f"คำถาม: {question}\n"
@@ -34,7 +43,7 @@ def extract_solution(text):
     """
     Extract content inside <SOLUTION>...</SOLUTION>
     """
-    match = re.search(r"<SOLUTION>\s*([\s\S]*?)\s*</SOLUTION>", text, re.IGNORECASE)
+    match = SOLUTION_RE.search(text)
     if match:
         return match.group(1).strip()
     return None
@@ -43,7 +52,7 @@ def extract_first_choice_letter(solution):
     """
     Get the first valid uppercase choice letter (A–E) from the solution
     """
-    match = re.match(r"[A-E]", solution.strip().upper())
+    match = CHOICE_LETTER_RE.match(solution.strip().upper())
     return match.group(0) if match else None
 
 def is_correct(predicted_output, answer_key):
@@ -56,82 +65,100 @@ def is_correct(predicted_output, answer_key):
         return pred_letter == answer_key.upper()
     return False
 
-all_results = {}
-glb_correct = 0
-glb_total = 0
-for config in CONFIGS:
-    print(f"Evaluating config: {config}")
-    dataset = load_dataset("scb10x/thai_exam", name=config)
-    data = dataset['test']
+async def ask(session, semaphore, item):
+    """
+    Send one exam question to the server and grade the answer.
+    Returns None when the item is skipped or the request fails.
+    """
+    question = item['question']
     
-    correct = 0
-    total = 0
-    results = []
+    choices = []
+    for label in ['A', 'B', 'C', 'D', 'E']:
+        choice_text = item.get(label.lower(), "").strip()
+        if choice_text:
+            choices.append((label, choice_text))
+        
+    ans_key = item['answer'].upper()
     
+    valid_ans_key = any(label == ans_key for label, _ in choices)
+    if not valid_ans_key:
+        return None
+    prompt = format_prompt(question, choices)
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
     
-    for item in tqdm(data):
-        question = item['question']
-        
-        choices = []
-        for label in ['A', 'B', 'C', 'D', 'E']:
-            choice_text = item.get(label.lower(), "").strip()
-            if choice_text:
-                choices.append((label, choice_text))
-            if not choices:
-                continue
-            
-        ans_key = item['answer'].upper()
-        
-        valid_ans_key = any(label == ans_key for label, _ in choices)
-        if not valid_ans_key:
-            continue
-        prompt = format_prompt(question, choices)
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ]
+    payload = {
+        "model": MODEL_NAME,
+        "messages": messages,
+        "max_tokens": 2048,
+        "temperature": 0.0,
+    }
+    
+    try:
+        async with semaphore:
+            async with session.post(VLLM_API_URL, json=payload) as response:
+                response.raise_for_status()
+                completion = await response.json()
+        generated_text = completion['choices'][0]['message']['content']
         
-        payload = {
-            "model": MODEL_NAME,
-            "messages": messages,
-            "max_tokens": 2048,
-            "temperature": 0.0,
+        return {
+            "question": question,
+            "choices": {label: text for label, text in choices},
+            "corret_answer": ans_key,
+            "model_ans": generated_text,
+            "is_correct": is_correct(generated_text, ans_key)
         }
-        
-        try:
-            response = requests.post(VLLM_API_URL, json=payload)
-            response.raise_for_status()
-            completion = response.json()
-            generated_text = completion['choices'][0]['message']['content']
-            
-            if is_correct(generated_text, ans_key):
-                correct += 1
-            total += 1
-            
-            results.append({
-                "question": question,
-                "choices": {label: text for label, text in choices},
-                "corret_answer": ans_key,
-                "model_ans": generated_text,
-                "is_correct": is_correct(generated_text, ans_key)
-            })
-        except Exception as e:
-            print(f"Error processing question: {e}")
-            continue
-    glb_correct += correct
-    glb_total += total       
+    except Exception as e:
+        print(f"Error processing question: {e}")
+        return None
+
+async def eval_config(session, semaphore, config):
+    print(f"Evaluating config: {config}")
+    dataset = load_dataset("scb10x/thai_exam", name=config)
+    data = dataset['test']
+    
+    # Dispatch every question at once; the semaphore bounds in-flight requests
+    answers = await tqdm.gather(*(ask(session, semaphore, item) for item in data))
+    results = [result for result in answers if result is not None]
+    
+    correct = sum(result["is_correct"] for result in results)
+    total = len(results)
     accuracy = correct / total if total > 0 else 0
     print(f"Accuracy for {config}: {accuracy:.2%}\n")
-    all_results[config] = {
+    return correct, total, {
         "accuracy": accuracy,
         "results": results
     }
-print(f"Total Correct: {glb_correct}")
-print(f"Total Questions: {glb_total}")
-accuracy = glb_correct / glb_total if glb_total > 0 else 0
-print(f"Accuracy: {accuracy:.2%}\n")    
-# Save results to JSON file
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump(all_results, f, ensure_ascii=False, indent=4)
 
-print(f"Results saved to {OUTPUT_FILE}")
\ No newline at end of file
+async def main():
+    all_results = {}
+    glb_correct = 0
+    glb_total = 0
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONCURRENT_REQUESTS,
+        limit_per_host=MAX_CONCURRENT_REQUESTS,
+        keepalive_timeout=KEEPALIVE_TIMEOUT
+    )
+    headers = {"Accept-Encoding": "gzip, deflate"}
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        for config in CONFIGS:
+            correct, total, all_results[config] = await eval_config(session, semaphore, config)
+            glb_correct += correct
+            glb_total += total
+    
+    print(f"Total Correct: {glb_correct}")
+    print(f"Total Questions: {glb_total}")
+    accuracy = glb_correct / glb_total if glb_total > 0 else 0
+    print(f"Accuracy: {accuracy:.2%}\n")    
+    # Save results to JSON file
+    with open(OUTPUT_FILE, "wb") as f:
+        f.write(orjson.dumps(all_results, option=orjson.OPT_INDENT_2))
+    
+    print(f"Results saved to {OUTPUT_FILE}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,4 +5,5 @@ vllm serve google/gemma-3-27b-it \
     --lora-module lora=/home/siamai/llmtune/LLaMA-Factory/MonkeyReasonerExport \
     --tensor-parallel-size 8 \
     --max-model-len 8192 \
+    --enable-prefix-caching \
     --port 2124
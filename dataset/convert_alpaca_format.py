@@ -1,56 +1,38 @@
-import json
+import os
+from multiprocessing import Pool
 
-def convert_to_alpaca_format(input_file, output_file):
+import ijson
+import orjson
+
+def convert_to_alpaca_format(input_file, output_file, processes=None):
     """
     Convert JSON data to Alpaca format
     
     Args:
         input_file (str): Path to input JSON file
         output_file (str): Path to output JSON file
+        processes (int): Worker processes for conversion (defaults to CPU count)
     """
     
-    # Read the input JSON file
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    alpaca_data = []
-    
-    # Process each entry in translated_entries
-    for entry in data["translated_entries"]:
-        # Extract system message as instruction
-        system_message = None
-        user_message = None
-        
-        for message in entry["messages"]:
-            if message["role"] == "system":
-                system_message = message["content"]
-            elif message["role"] == "user":
-                user_message = message["content"]
-        
-        # Create the output by combining reasoning and answer
-        # Wrap reasoning in <think> tags
-        reasoning = entry.get("reasoning", "")
-        answer = entry.get("answer", "")
-        
-        if reasoning:
-            output = f"<think>{reasoning}</think>\n\n{answer}"
-        else:
-            output = answer
-        
-        # Create Alpaca format entry
-        alpaca_entry = {
-            "instruction": system_message if system_message is not None else "",
-            "input": user_message if user_message is not None else "",
-            "output": output
-        }
-        
-        alpaca_data.append(alpaca_entry)
+    count = 0
     
-    # Write to output file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(alpaca_data, f, ensure_ascii=False, indent=2)
+    # Stream entries from translated_entries through a worker pool and write each
+    # one as soon as it is converted, so neither the input nor the output is held
+    # in memory; imap keeps the original entry order
+    with open(input_file, 'rb') as fin, open(output_file, 'wb') as fout, \
+            Pool(processes or os.cpu_count()) as pool:
+        fout.write(b"[")
+        # use_float: ijson yields Decimal by default, which orjson cannot serialize
+        entries = ijson.items(fin, "translated_entries.item", use_float=True)
+        for encoded in pool.imap(encode_single_entry, entries, chunksize=1000):
+            if count:
+                fout.write(b",")
+            fout.write(b"\n")
+            fout.write(encoded)
+            count += 1
+        fout.write(b"\n]\n")
     
-    print(f"Conversion complete! {len(alpaca_data)} entries converted.")
+    print(f"Conversion complete! {count} entries converted.")
     print(f"Output saved to: {output_file}")
 
 def convert_single_entry(entry):
@@ -88,6 +70,18 @@ def convert_single_entry(entry):
         "output": output
     }
 
+def encode_single_entry(entry):
+    """
+    Convert a single entry and serialize it to JSON bytes (runs in pool workers)
+    
+    Args:
+        entry (dict): Single entry from translated_entries
+        
+    Returns:
+        bytes: JSON-encoded Alpaca format entry
+    """
+    return orjson.dumps(convert_single_entry(entry))
+
 # Example usage with your provided data
 if __name__ == "__main__":
     convert_to_alpaca_format("translated_dataset/translated_data.json", "alpaca_format.json")
\ No newline at end of file
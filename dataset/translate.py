@@ -1,16 +1,27 @@
 import asyncio
 import aiohttp
-import json
+import hashlib
+import orjson
+import random
+import re
 import time
 import os
+import signal
 from typing import List, Dict, Any, Optional
 from datasets import load_dataset
+from transformers import AutoTokenizer
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 import logging
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
 # Server Configuration
-VLLM_SERVER_URL = "http://localhost:8000/v1/chat/completions"
+VLLM_SERVER_URL = "http://localhost:8000/v1/completions"  # Accepts a list of prompts per request
 MODEL_NAME = "google/gemma-3-27b-it"
 
 # File Paths
@@ -18,17 +29,21 @@ OUTPUT_DIR = "data"
 CHECKPOINT_FILE = "tl_chkp.json"
 TRANSLATED_FILE = "tl_data.json"  # Changed to .json for structured format
 INCREMENTAL_FILE = "tl_increment.jsonl"  # Backup incremental file
+CACHE_FILE = "tl_cache-{fingerprint}.jsonl"  # Translations keyed by source-text hash, one file per translation setup
 LOG_FILE = "tl.log"
 
 # Processing Limits
 INITIAL_LIMIT = None  # Process only first 100 entries for testing (set to None for full dataset)
-MAX_CONCURRENT_REQUESTS = 64  # Number of concurrent translation requests
+MAX_CONCURRENT_REQUESTS = 64  # Prompts (sequences) in flight, keep equal to the server's --max-num-seqs
+AVG_TEXTS_PER_ENTRY = 4  # Messages + reasoning + answer translated per entry
 BATCH_SIZE = 32  # Number of entries to process in each batch
+PROMPTS_PER_REQUEST = 8  # Number of texts sent together in one completions request
 
 # Model Parameters
 TEMPERATURE = 0.1  # Lower temperature for more consistent translations
 MAX_TOKENS = 6555  # Maximum tokens for translation output
 RETRY_COUNT = 3  # Number of retry attempts for failed requests
+CACHE_MAX_ENTRIES = 100_000  # Translations held in memory; older ones stay on disk only
 
 # Connection Settings
 HTTP_TIMEOUT = 120  # Timeout in seconds for HTTP requests
@@ -46,6 +61,32 @@ SYSTEM_PROMPT = """
 6. ห้ามตอบคำถามหรือให้คำแนะนำใดๆ เกี่ยวกับโจทย์
 แปลข้อความต่อไปนี้จากภาษาอังกฤษเป็นภาษาไทย:"""
 
+# Texts without a run of 3+ Latin letters (empty, numbers, bare math/LaTeX) are kept verbatim
+NEEDS_TRANSLATION_RE = re.compile(r"[A-Za-z]{3,}")
+
+def needs_translation(text: str) -> bool:
+    """Return False for texts the system prompt would leave unchanged anyway"""
+    return len(text.strip()) >= 4 and NEEDS_TRANSLATION_RE.search(text) is not None
+
+def cache_fingerprint() -> str:
+    """Hash everything besides the source text that shapes a translation"""
+    settings = orjson.dumps({
+        "model": MODEL_NAME,
+        "system_prompt": SYSTEM_PROMPT,
+        "temperature": TEMPERATURE,
+        "max_tokens": MAX_TOKENS
+    })
+    return hashlib.blake2b(settings, digest_size=8).hexdigest()
+
+def write_atomic(path: Path, data: bytes):
+    """Write to a temp file and rename over path, so a crash never leaves a torn file"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 # =============================================================================
 
 @dataclass
@@ -60,8 +101,18 @@ class ThaiTranslator:
     def __init__(self, server_url: str):
         self.server_url = server_url
         self.max_concurrent = MAX_CONCURRENT_REQUESTS
-        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Each HTTP request carries up to PROMPTS_PER_REQUEST sequences
+        self.semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENT_REQUESTS // PROMPTS_PER_REQUEST))
+        # Limit entries in flight so their fan-out doesn't queue far past the server's capacity
+        self.entry_semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENT_REQUESTS // AVG_TEXTS_PER_ENTRY))
         self.session = None
+        self.incremental_file = None
+        self.cache_file = None
+        self.cache_path = Path(OUTPUT_DIR) / CACHE_FILE.format(fingerprint=cache_fingerprint())
+        self.cache: Dict[bytes, str] = {}  # blake2b(source text) -> translation, least recently used first
+        self.skipped_texts = 0  # Texts returned verbatim without a server call
+        # Prompts are rendered client-side so several can share one /v1/completions call
+        self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
         self.translated_entries = []  # Store all translated entries for structured output
         
         # Setup logging
@@ -84,53 +135,141 @@ class ThaiTranslator:
             limit_per_host=TCP_CONNECTOR_LIMIT_PER_HOST
         )
         timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
-        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            json_serialize=lambda obj: orjson.dumps(obj).decode()
+        )
+        # Keep the incremental backup open for the whole run instead of reopening per entry
+        self.incremental_file = open(Path(OUTPUT_DIR) / INCREMENTAL_FILE, "ab", buffering=1 << 20)
+        self.load_cache()
+        # New translations are appended as they arrive and flushed with the JSONL backup
+        self.cache_file = open(self.cache_path, "ab", buffering=1 << 20)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+        if self.incremental_file:
+            self.incremental_file.close()
+        if self.cache_file:
+            self.cache_file.close()
 
-    async def translate_text(self, text: str) -> Optional[str]:
-        """Translate a single text using the vLLM server"""
-        async with self.semaphore:
-            for attempt in range(RETRY_COUNT):
+    def load_cache(self):
+        """Load cached translations from a previous run with the same setup"""
+        if not self.cache_path.exists():
+            return
+        skipped = 0
+        with open(self.cache_path, "rb") as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line)
+                    key = bytes.fromhex(record["key"])
+                    # Re-insert so a re-written key takes its latest position
+                    self.cache.pop(key, None)
+                    self.cache[key] = record["text"]
+                except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+                    skipped += 1  # Torn last line from an interrupted run
+        # Later lines are the most recently written, so keep those
+        for key in list(islice(self.cache, max(0, len(self.cache) - CACHE_MAX_ENTRIES))):
+            del self.cache[key]
+        self.logger.info(f"Loaded {len(self.cache)} cached translations")
+        if skipped:
+            self.logger.warning(f"Skipped {skipped} unreadable translation cache lines")
+
+    def cache_translation(self, key: bytes, translation: str):
+        """Remember a translation, evicting the least recently used past CACHE_MAX_ENTRIES"""
+        self.cache[key] = translation
+        self.cache_file.write(orjson.dumps({"key": key.hex(), "text": translation}) + b"\n")
+        if len(self.cache) > CACHE_MAX_ENTRIES:
+            del self.cache[next(iter(self.cache))]
+
+    @staticmethod
+    def cache_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def render_prompt(self, text: str) -> str:
+        """Render a translation request through the model's chat template"""
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text}
+        ]
+        return self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+
+    async def complete_prompts(self, texts: List[str]) -> List[Optional[str]]:
+        """Translate a group of texts with a single completions request"""
+        payload = {
+            "model": MODEL_NAME,
+            "prompt": [self.render_prompt(text) for text in texts],
+            "temperature": TEMPERATURE,
+            "max_tokens": MAX_TOKENS,
+            "add_special_tokens": False,  # The chat template already adds BOS
+            "stream": False
+        }
+        
+        for attempt in range(RETRY_COUNT):
+            # Only hold a concurrency slot while the request is in flight
+            async with self.semaphore:
                 try:
-                    payload = {
-                        "model": MODEL_NAME,
-                        "messages": [
-                            {"role": "system", "content": SYSTEM_PROMPT},
-                            {"role": "user", "content": text}
-                        ],
-                        "temperature": TEMPERATURE,
-                        "max_tokens": MAX_TOKENS,
-                        "stream": False
-                    }
-                    
                     async with self.session.post(self.server_url, json=payload) as response:
                         if response.status == 200:
-                            result = await response.json()
-                            translated = result["choices"][0]["message"]["content"].strip()
-                            return translated
+                            result = await response.json(loads=orjson.loads)
+                            translations = [None] * len(texts)
+                            for choice in result["choices"]:
+                                translations[choice["index"]] = choice["text"].strip()
+                            return translations
                         else:
                             self.logger.warning(f"HTTP {response.status} on attempt {attempt + 1}")
                             
                 except Exception as e:
                     self.logger.warning(f"Translation attempt {attempt + 1} failed: {str(e)}")
-                    if attempt < RETRY_COUNT - 1:
-                        await asyncio.sleep(2 ** attempt)  # Exponential backoff
+            
+            if attempt < RETRY_COUNT - 1:
+                # Jittered exponential backoff, outside the semaphore
+                await asyncio.sleep((2 ** attempt) * random.uniform(0.5, 1.5))
                     
-            return None
+        return [None] * len(texts)
+
+    async def translate_texts_batch(self, texts: List[str]) -> List[Optional[str]]:
+        """Translate texts in order, PROMPTS_PER_REQUEST prompts per HTTP call"""
+        keys = [self.cache_key(text) for text in texts]
+        
+        # Only send texts that need translating and are neither cached nor
+        # repeated earlier in this batch
+        pending = {}
+        verbatim = {}
+        found = {}
+        for key, text in zip(keys, texts):
+            if not needs_translation(text):
+                verbatim[key] = text
+                self.skipped_texts += 1
+            elif key in self.cache:
+                # Re-insert so hits move to the most recently used end
+                found[key] = self.cache[key] = self.cache.pop(key)
+            elif key not in found and key not in pending:
+                pending[key] = text
+        
+        if pending:
+            pending_keys = list(pending)
+            pending_texts = list(pending.values())
+            chunks = [pending_texts[i:i + PROMPTS_PER_REQUEST] for i in range(0, len(pending_texts), PROMPTS_PER_REQUEST)]
+            results = await asyncio.gather(*(self.complete_prompts(chunk) for chunk in chunks))
+            translations = [translation for chunk in results for translation in chunk]
+            for key, translation in zip(pending_keys, translations):
+                if translation is not None:
+                    found[key] = translation
+                    self.cache_translation(key, translation)
+        
+        return [verbatim[key] if key in verbatim else found.get(key) for key in keys]
+
+    async def translate_text(self, text: str) -> Optional[str]:
+        """Translate a single text using the vLLM server"""
+        return (await self.translate_texts_batch([text]))[0]
 
-    def translate_messages(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
-        """Translate all messages in a conversation"""
-        translated_messages = []
-        for msg in messages:
-            translated_msg = msg.copy()
-            # Only translate the content, keep role unchanged
-            translated_msg["content"] = msg["content"]  # Will be translated later
-            translated_messages.append(translated_msg)
-        return translated_messages
+    async def translate_entry_bounded(self, entry: Dict[str, Any], index: int) -> Optional[Dict[str, Any]]:
+        """Translate an entry while holding an entry-level concurrency slot"""
+        async with self.entry_semaphore:
+            return await self.translate_entry(entry, index)
 
     async def translate_entry(self, entry: Dict[str, Any], index: int) -> Optional[Dict[str, Any]]:
         """Translate a single dataset entry"""
@@ -138,33 +277,26 @@ class ThaiTranslator:
             translated_entry = entry.copy()
             
             # Translate messages
-            texts_to_translate = []
-            message_indices = []
-            
-            for i, msg in enumerate(entry["messages"]):
-                texts_to_translate.append(msg["content"])
-                message_indices.append(i)
+            texts_to_translate = [msg["content"] for msg in entry["messages"]]
             
             # Add reasoning and answer to translation queue
             texts_to_translate.append(entry["reasoning"])
             texts_to_translate.append(entry["answer"])
             
-            # Translate all texts concurrently
-            translation_tasks = [self.translate_text(text) for text in texts_to_translate]
-            translations = await asyncio.gather(*translation_tasks, return_exceptions=True)
+            # Translate all texts of the entry in batched requests
+            translations = await self.translate_texts_batch(texts_to_translate)
             
             # Check for failures
             for i, translation in enumerate(translations):
-                if isinstance(translation, Exception) or translation is None:
+                if translation is None:
                     self.logger.error(f"Failed to translate entry {index}, text {i}")
                     return None
             
-            # Apply translations to messages
-            translated_entry["messages"] = []
-            for i, msg in enumerate(entry["messages"]):
-                translated_msg = msg.copy()
-                translated_msg["content"] = translations[message_indices.index(i)]
-                translated_entry["messages"].append(translated_msg)
+            # Apply translations to messages, which come first in the queue
+            translated_entry["messages"] = [
+                {**msg, "content": translations[i]}
+                for i, msg in enumerate(entry["messages"])
+            ]
             
             # Apply translations to reasoning and answer
             translated_entry["reasoning"] = translations[-2]
@@ -195,8 +327,7 @@ class ThaiTranslator:
         }
         
         checkpoint_path = Path(OUTPUT_DIR) / CHECKPOINT_FILE
-        with open(checkpoint_path, "w", encoding="utf-8") as f:
-            json.dump(checkpoint_data, f, indent=2)
+        write_atomic(checkpoint_path, orjson.dumps(checkpoint_data, option=orjson.OPT_INDENT_2))
         
         self.logger.info(f"Checkpoint saved: {progress.completed_items}/{progress.total_items} completed")
 
@@ -205,8 +336,8 @@ class ThaiTranslator:
         checkpoint_path = Path(OUTPUT_DIR) / CHECKPOINT_FILE
         if checkpoint_path.exists():
             try:
-                with open(checkpoint_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(checkpoint_path, "rb") as f:
+                    data = orjson.loads(f.read())
                 return TranslationProgress(**data)
             except Exception as e:
                 self.logger.warning(f"Could not load checkpoint: {str(e)}")
@@ -217,10 +348,14 @@ class ThaiTranslator:
         # Add to memory for final structured output
         self.translated_entries.append(entry)
         
-        # Also save incremental backup (JSONL format for safety)
-        incremental_path = Path(OUTPUT_DIR) / INCREMENTAL_FILE
-        with open(incremental_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        # Also save incremental backup (JSONL format for safety), flushed once per batch
+        self.incremental_file.write(orjson.dumps(entry) + b"\n")
+
+    def flush_incremental(self):
+        """Push buffered incremental entries and new cached translations to disk"""
+        for f in (self.incremental_file, self.cache_file):
+            f.flush()
+            os.fsync(f.fileno())
 
     def save_structured_json(self):
         """Save all translated entries as structured JSON"""
@@ -242,11 +377,16 @@ class ThaiTranslator:
         }
         
         output_path = Path(OUTPUT_DIR) / TRANSLATED_FILE
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        write_atomic(output_path, orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         self.logger.info(f"Structured JSON saved: {len(self.translated_entries)} entries")
 
+    def _handle_sigterm(self, signum, frame):
+        """Write the structured JSON before exiting on SIGTERM"""
+        self.logger.warning("Received SIGTERM, saving structured JSON before exit")
+        self.save_structured_json()
+        raise SystemExit(128 + signum)
+
     def load_existing_translations(self) -> List[Dict[str, Any]]:
         """Load existing translations from incremental file if resuming"""
         incremental_path = Path(OUTPUT_DIR) / INCREMENTAL_FILE
@@ -254,11 +394,11 @@ class ThaiTranslator:
         
         if incremental_path.exists():
             try:
-                with open(incremental_path, "r", encoding="utf-8") as f:
+                with open(incremental_path, "rb") as f:
                     for line in f:
                         line = line.strip()
                         if line:
-                            entry = json.loads(line)
+                            entry = orjson.loads(line)
                             existing_entries.append(entry)
                 self.logger.info(f"Loaded {len(existing_entries)} existing translations")
             except Exception as e:
@@ -292,15 +432,19 @@ class ThaiTranslator:
                 last_checkpoint=time.time()
             )
         
-        # Process in batches for better memory management
+        # Structured JSON is only written at the end, so flush it if we get killed
+        signal.signal(signal.SIGTERM, self._handle_sigterm)
+        
+        # Process in batches for better memory management, streaming rows once
+        # instead of re-slicing the Arrow table per batch
+        entries = islice(dataset.to_iterable_dataset(), start_idx, None)
         
         for batch_start in range(start_idx, dataset_size, BATCH_SIZE):
-            batch_end = min(batch_start + BATCH_SIZE, dataset_size)
-            batch_entries = dataset.select(range(batch_start, batch_end))
+            batch_entries = list(islice(entries, BATCH_SIZE))
             
             # Translate batch
             translation_tasks = [
-                self.translate_entry(entry, batch_start + i) 
+                self.translate_entry_bounded(entry, batch_start + i) 
                 for i, entry in enumerate(batch_entries)
             ]
             
@@ -317,9 +461,9 @@ class ThaiTranslator:
                     self.save_translated_entry(result)
                     progress.completed_items += 1
             
-            # Save checkpoint and structured JSON every batch
+            # Save checkpoint every batch; the JSONL backup already holds the entries
+            self.flush_incremental()
             self.save_checkpoint(progress)
-            self.save_structured_json()  # Update structured JSON after each batch
             
             # Log progress
             elapsed = time.time() - progress.start_time
@@ -344,6 +488,7 @@ class ThaiTranslator:
         self.logger.info(f"Success rate: {success_rate:.1f}%")
         self.logger.info(f"Total time: {total_time/60:.1f} minutes")
         self.logger.info(f"Failed entries: {len(progress.failed_items)}")
+        self.logger.info(f"Texts kept verbatim (no translation needed): {self.skipped_texts}")
         
         if progress.failed_items:
             self.logger.info(f"Failed entry indices: {progress.failed_items}")
@@ -374,4 +519,6 @@ async def main():
     print(f"📊 Logs: {LOG_FILE}")
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
     asyncio.run(main())
\ No newline at end of file
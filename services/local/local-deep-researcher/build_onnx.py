@@ -0,0 +1,58 @@
+"""Export the fine-tuned intent classifier to ONNX for intent_server.py."""
+
+import logging
+import os
+
+import torch
+
+from intent_model import load_trained_model
+
+logger = logging.getLogger("build_onnx")
+
+ONNX_OPSET = 17
+
+class LogitsOnly(torch.nn.Module):
+    """Expose the classifier's logits as a plain tensor output for export."""
+    def __init__(self, model):
+        """Wrap a classifier whose forward returns a dict with a "logits" entry."""
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        """Return the logits tensor alone."""
+        return self.model(input_ids=input_ids, attention_mask=attention_mask)["logits"]
+
+def build_onnx(model_path, onnx_path):
+    """Export the fine-tuned intent classifier to ONNX with dynamic batch and sequence axes."""
+    logger.info("Loading model from: %s", model_path)
+    # Eager attention traces without data-dependent mask branches
+    model = LogitsOnly(load_trained_model(model_path, attn_implementation="eager"))
+    model.eval()
+
+    input_ids = torch.ones((1, 16), dtype=torch.long)
+    attention_mask = torch.ones((1, 16), dtype=torch.long)
+
+    logger.info("Exporting ONNX model to: %s", onnx_path)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (input_ids, attention_mask),
+            onnx_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "seq"},
+                "attention_mask": {0: "batch", 1: "seq"},
+                "logits": {0: "batch"}
+            },
+            opset_version=ONNX_OPSET
+        )
+    logger.info("✅ ONNX export complete")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    build_onnx(
+        os.path.join(current_dir, "intent_classifier_xlm.pth"),
+        os.path.join(current_dir, "intent_classifier_xlm.onnx")
+    )
@@ -0,0 +1,33 @@
+"""Export the training label encoder's classes to JSON for intent_server.py."""
+
+import json
+import logging
+import os
+import pickle
+
+import torch
+
+logger = logging.getLogger("export_label_classes")
+
+def export_label_classes(label_encoder_path, classes_path):
+    """Write the label encoder's classes to JSON so serving needs no pickle or sklearn."""
+    logger.info("Loading label encoder from: %s", label_encoder_path)
+    try:
+        with open(label_encoder_path, 'rb') as f:
+            label_encoder = pickle.load(f, encoding='latin1')
+    except Exception:
+        # The encoder was saved with torch.save
+        label_encoder = torch.load(label_encoder_path, map_location='cpu', weights_only=False)
+
+    classes = [str(label) for label in label_encoder.classes_]
+    with open(classes_path, 'w', encoding='utf-8') as f:
+        json.dump({"classes": classes}, f, ensure_ascii=False, indent=2)
+    logger.info("✅ Wrote %d classes to: %s", len(classes), classes_path)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    export_label_classes(
+        os.path.join(current_dir, "label_encoder_xlm.pkl"),
+        os.path.join(current_dir, "label_encoder_xlm.json")
+    )
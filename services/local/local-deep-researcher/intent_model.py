@@ -0,0 +1,73 @@
+import torch
+import torch.nn as nn
+from transformers import XLMRobertaModel
+
+class CustomXLMRobertaModel(nn.Module):
+    def __init__(self, num_labels, attn_implementation=None, add_pooling_layer=False):
+        super(CustomXLMRobertaModel, self).__init__()
+        model_name = 'symanto/xlm-roberta-base-snli-mnli-anli-xnli'
+        # Without the pooler the head reads the [CLS] hidden state directly,
+        # skipping a Linear(768, 768) + Tanh the head immediately re-projects anyway
+        self.roberta = XLMRobertaModel.from_pretrained(
+            model_name,
+            attn_implementation=attn_implementation,
+            add_pooling_layer=add_pooling_layer
+        )
+        self.dropout = nn.Dropout(0.2)
+        self.classifier = nn.Sequential(
+            nn.Linear(768, 512),
+            nn.LayerNorm(512),
+            nn.ReLU(),
+            nn.Dropout(0.2),
+            nn.Linear(512, num_labels)
+        )
+        self.loss = nn.CrossEntropyLoss()
+        self.num_labels = num_labels
+
+    def forward(self, input_ids, attention_mask, labels=None):
+        output = self.roberta(input_ids=input_ids, attention_mask=attention_mask)
+        if output.pooler_output is not None:
+            output = self.dropout(output.pooler_output)
+        else:
+            output = self.dropout(output.last_hidden_state[:, 0])
+        logits = self.classifier(output)
+
+        if labels is not None:
+            loss = self.loss(logits.view(-1, self.num_labels), labels.view(-1))
+            return {"loss": loss, "logits": logits}
+        else:
+            return {"logits": logits}
+
+    def fuse_for_inference(self):
+        """Drop modules that are no-ops in eval mode from the forward path."""
+        # Dropout is the identity in eval; swapping it out saves a module call per layer.
+        # The LayerNorm stays: it normalizes with per-sample statistics ahead of the ReLU,
+        # so unlike BatchNorm it cannot be folded into a neighbouring Linear.
+        self.dropout = nn.Identity()
+        self.classifier = nn.Sequential(*(
+            nn.Identity() if isinstance(layer, nn.Dropout) else layer
+            for layer in self.classifier
+        ))
+        return self
+
+def load_trained_model(model_path, num_labels=4, attn_implementation=None):
+    """Build the classifier and load the fine-tuned weights on CPU in eval mode."""
+    # Load state dict with error handling
+    state_dict = torch.load(model_path, map_location='cpu', weights_only=True)
+
+    # Heads trained on pooler_output need the pooler to reproduce their predictions
+    has_pooler = any(k.startswith('roberta.pooler.') for k in state_dict)
+    model = CustomXLMRobertaModel(
+        num_labels=num_labels,
+        attn_implementation=attn_implementation,
+        add_pooling_layer=has_pooler
+    )
+    
+    # Remove problematic keys for transformer compatibility
+    keys_to_remove = [k for k in state_dict.keys() if 'position_ids' in k]
+    for key in keys_to_remove:
+        del state_dict[key]
+        
+    model.load_state_dict(state_dict, strict=False)
+    model.eval()
+    return model.fuse_for_inference()
@@ -1,49 +1,75 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import threading
 import torch
 import torch.nn as nn
-import pickle
 import time
 import os
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from transformers import AutoTokenizer, XLMRobertaModel
-from typing import Dict, Any, Optional
+from transformers import AutoTokenizer
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 import uvicorn
 
-class CustomXLMRobertaModel(nn.Module):
-    def __init__(self, num_labels):
-        super(CustomXLMRobertaModel, self).__init__()
-        model_name = 'symanto/xlm-roberta-base-snli-mnli-anli-xnli'
-        self.roberta = XLMRobertaModel.from_pretrained(model_name)
-        self.dropout = nn.Dropout(0.2)
-        self.classifier = nn.Sequential(
-            nn.Linear(768, 512),
-            nn.LayerNorm(512),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(512, num_labels)
-        )
-        self.loss = nn.CrossEntropyLoss()
-        self.num_labels = num_labels
+from intent_model import load_trained_model
 
-    def forward(self, input_ids, attention_mask, labels=None):
-        output = self.roberta(input_ids=input_ids, attention_mask=attention_mask)
-        output = self.dropout(output.pooler_output)
-        logits = self.classifier(output)
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
-        if labels is not None:
-            loss = self.loss(logits.view(-1, self.num_labels), labels.view(-1))
-            return {"loss": loss, "logits": logits}
-        else:
-            return {"logits": logits}
+logger = logging.getLogger("intent_server")
+
+# Dynamic micro-batching of concurrent /classify requests
+MAX_BATCH_SIZE = 32  # Maximum texts classified in one forward pass
+BATCH_WAIT_SECONDS = 0.005  # How long to wait for more requests before running a batch
+
+# Opt-in torch.compile(mode="reduce-overhead"), which fuses kernels and captures its own
+# CUDA Graphs per static shape; replaces the manual capture below when enabled
+USE_TORCH_COMPILE = (
+    torch.cuda.is_available()
+    and os.environ.get("TORCH_COMPILE", "0") == "1"
+    and tuple(int(part) for part in torch.__version__.split(".")[:2]) >= (2, 2)
+)
+
+# CUDA Graph capture of the forward pass for static (batch, sequence length) buckets
+USE_CUDA_GRAPHS = torch.cuda.is_available() and not USE_TORCH_COMPILE
+LENGTH_BUCKETS = (32, 64, 128, 256, 512)
+GRAPH_BATCH_SIZES = (1, 8, MAX_BATCH_SIZE)
+GRAPH_WARMUP_ITERS = 3
+WARMUP_ITERS = 3  # Startup forwards per length bucket so the first requests skip lazy init
+
+# LRU cache of classifications keyed on a digest of the normalized text
+CACHE_MAX_SIZE = 4096
+
+# ONNX Runtime backend, used instead of PyTorch when an exported model exists (see build_onnx.py)
+ONNX_MODEL_FILE = "intent_classifier_xlm.onnx"
+NUM_LABELS = 4
 
 class IntentClassifierService:
     def __init__(self):
         self.device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
         self.model = None
+        self.ort_session = None
         self.tokenizer = None
-        self.label_encoder = None
+        self.classes: List[str] = []  # Label encoder classes indexed by class id
+        self.queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self.graphs: Dict[Tuple[int, int], Tuple[torch.cuda.CUDAGraph, torch.Tensor, torch.Tensor, torch.Tensor]] = {}
+        self.graph_lock = threading.Lock()
+        self.cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        # Page-locked host staging buffers per length bucket for async host-to-device copies
+        self.pinned: Dict[int, Tuple[torch.Tensor, torch.Tensor]] = {}
         self.load_model()
         
+    @property
+    def model_loaded(self) -> bool:
+        return self.model is not None or self.ort_session is not None
+        
     def load_model(self):
         """Load the XLM-RoBERTa intent classification model."""
         try:
@@ -52,89 +78,376 @@ class IntentClassifierService:
             # Paths
             model_path = os.path.join(current_dir, "intent_classifier_xlm.pth")
             tokenizer_path = os.path.join(current_dir, "tokenizer_final")
-            label_encoder_path = os.path.join(current_dir, "label_encoder_xlm.pkl")
+            classes_path = os.path.join(current_dir, "label_encoder_xlm.json")
             
             print(f"Loading model from: {model_path}")
             print(f"Loading tokenizer from: {tokenizer_path}")
-            print(f"Loading label encoder from: {label_encoder_path}")
+            print(f"Loading label classes from: {classes_path}")
             
-            # Load tokenizer
-            self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+            # Load the Rust-backed fast tokenizer (tokenizer.json ships with the artifacts)
+            self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_path, use_fast=True)
+            if not self.tokenizer.is_fast:
+                raise RuntimeError(f"Fast tokenizer unavailable for {tokenizer_path}")
+            self.tokenizer.model_max_length = LENGTH_BUCKETS[-1]
+            self.tokenizer.padding_side = "right"
             
-            # Load label encoder with encoding fix
-            try:
-                with open(label_encoder_path, 'rb') as f:
-                    self.label_encoder = pickle.load(f, encoding='latin1')
-            except:
-                # Fallback: load with torch.load if pickle fails
-                self.label_encoder = torch.load(label_encoder_path, map_location='cpu', weights_only=False)
-            
-            # Load model
-            self.model = CustomXLMRobertaModel(num_labels=4)
-            
-            # Load state dict with error handling
-            state_dict = torch.load(model_path, map_location='cpu', weights_only=True)
-            
-            # Remove problematic keys for transformer compatibility
-            keys_to_remove = [k for k in state_dict.keys() if 'position_ids' in k]
-            for key in keys_to_remove:
-                del state_dict[key]
-                
-            self.model.load_state_dict(state_dict, strict=False)
-            self.model.to(self.device)
-            self.model.eval()
+            # Plain JSON class list exported from the label encoder (see export_label_classes.py)
+            with open(classes_path, 'r', encoding='utf-8') as f:
+                self.classes = json.load(f)["classes"]
+            
+            onnx_path = os.path.join(current_dir, ONNX_MODEL_FILE)
+            if ort is not None and os.path.exists(onnx_path):
+                self.load_onnx_session(onnx_path)
+            else:
+                self.load_torch_model(model_path)
+            
+            if self.device.type == "cuda":
+                self.allocate_pinned_buffers()
+            
+            self.warmup()
             
             print(f"✅ Intent classifier loaded successfully on {self.device}")
-            print(f"📋 Available classes: {list(self.label_encoder.classes_)}")
+            print(f"📋 Available classes: {self.classes}")
             
         except Exception as e:
             print(f"❌ Failed to load intent classifier: {str(e)}")
             raise e
     
-    def classify_intent(self, text: str) -> Dict[str, Any]:
-        """Classify intent of input text."""
-        if not self.model or not self.tokenizer or not self.label_encoder:
-            raise HTTPException(status_code=500, detail="Model not loaded")
+    def load_torch_model(self, model_path: str):
+        """Load the PyTorch model and prepare it for inference on the service device."""
+        # Eager attention has no data-dependent mask checks, so it can be graph-captured
+        self.model = load_trained_model(
+            model_path,
+            num_labels=NUM_LABELS,
+            attn_implementation="eager" if USE_CUDA_GRAPHS else None
+        )
+        self.model.to(self.device)
+        
+        if self.device.type == "cuda":
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.benchmark = True
+        
+        # Half precision halves weight traffic and enables tensor cores on GPU
+        if self.device.type == "cuda":
+            self.model.to(torch.float16)
+        else:
+            # CPU fallback: int8 dynamic quantization of every Linear (FBGEMM on x86),
+            # embeddings and LayerNorm stay FP32
+            if "fbgemm" in torch.backends.quantized.supported_engines:
+                torch.backends.quantized.engine = "fbgemm"
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {nn.Linear}, dtype=torch.qint8
+            )
+        
+        if USE_TORCH_COMPILE:
+            self.compile_model()
+        elif USE_CUDA_GRAPHS:
+            self.capture_cuda_graphs()
+    
+    def compile_model(self):
+        """Compile the model and trace every (batch, length) bucket before serving."""
+        # One compiled graph per bucket shape; never fall back to eager on recompile limits
+        torch._dynamo.config.cache_size_limit = max(
+            torch._dynamo.config.cache_size_limit, len(GRAPH_BATCH_SIZES) * len(LENGTH_BUCKETS)
+        )
+        self.model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False, dynamic=False)
+        
+        pad_token_id = self.tokenizer.pad_token_id
+        for batch_size in GRAPH_BATCH_SIZES:
+            for length in LENGTH_BUCKETS:
+                input_ids = torch.full((batch_size, length), pad_token_id, dtype=torch.long, device=self.device)
+                attention_mask = torch.ones((batch_size, length), dtype=torch.long, device=self.device)
+                with torch.inference_mode():
+                    for _ in range(GRAPH_WARMUP_ITERS):
+                        self.model(input_ids=input_ids, attention_mask=attention_mask)
+        torch.cuda.synchronize(self.device)
+        print(f"🔧 Compiled model for {len(GRAPH_BATCH_SIZES) * len(LENGTH_BUCKETS)} bucket shapes")
+    
+    def warmup(self):
+        """Run a few forwards at every length bucket to pay kernel selection and lazy init up front."""
+        for length in LENGTH_BUCKETS:
+            input_ids = torch.full((1, length), self.tokenizer.pad_token_id, dtype=torch.long, device=self.device)
+            attention_mask = torch.ones((1, length), dtype=torch.long, device=self.device)
+            with torch.inference_mode():
+                for _ in range(WARMUP_ITERS):
+                    self.forward_logits(input_ids, attention_mask)
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+    
+    def allocate_pinned_buffers(self):
+        """Allocate reusable page-locked input buffers for every length bucket."""
+        for length in LENGTH_BUCKETS:
+            self.pinned[length] = (
+                torch.zeros((MAX_BATCH_SIZE, length), dtype=torch.long, pin_memory=True),
+                torch.zeros((MAX_BATCH_SIZE, length), dtype=torch.long, pin_memory=True)
+            )
+    
+    def to_device(self, array: np.ndarray, staging: Optional[torch.Tensor]) -> torch.Tensor:
+        """Move a padded token array to the service device, staging through pinned memory when possible."""
+        tensor = torch.from_numpy(array)
+        if self.device.type != "cuda":
+            return tensor
+        if staging is None or tensor.shape[0] > staging.shape[0]:
+            return tensor.to(self.device)
+        # Pinned source lets the copy run asynchronously; a torch forward queued after it
+        # on the same stream orders the reads (ONNX Runtime syncs the stream first), and
+        # results are synced by .cpu() before reuse
+        staged = staging[:tensor.shape[0]]
+        staged.copy_(tensor)
+        return staged.to(self.device, non_blocking=True)
+    
+    def load_onnx_session(self, onnx_path: str):
+        """Load the exported model into an ONNX Runtime session."""
+        print(f"Loading ONNX model from: {onnx_path}")
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        if self.device.type == "cuda":
+            providers.insert(0, ("CUDAExecutionProvider", {"device_id": self.device.index or 0}))
+        self.ort_session = ort.InferenceSession(onnx_path, sess_options=sess_options, providers=providers)
+    
+    def forward_logits_onnx(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """Run the ONNX Runtime session, binding torch tensors in place to avoid copies."""
+        device_type = self.device.type
+        device_id = self.device.index or 0
+        input_ids = input_ids.contiguous()
+        attention_mask = attention_mask.contiguous()
+        logits = torch.empty((input_ids.shape[0], NUM_LABELS), dtype=torch.float32, device=self.device)
+        
+        binding = self.ort_session.io_binding()
+        for name, tensor in (("input_ids", input_ids), ("attention_mask", attention_mask)):
+            binding.bind_input(name, device_type, device_id, np.int64, tuple(tensor.shape), tensor.data_ptr())
+        binding.bind_output("logits", device_type, device_id, np.float32, tuple(logits.shape), logits.data_ptr())
+        if device_type == "cuda":
+            # ONNX Runtime reads on its own stream, so finish the queued non_blocking input copies first
+            torch.cuda.current_stream(self.device).synchronize()
+        self.ort_session.run_with_iobinding(binding)
+        return logits
+    
+    def capture_cuda_graphs(self):
+        """Capture the forward pass as a CUDA Graph for every (batch, length) bucket."""
+        pad_token_id = self.tokenizer.pad_token_id
+        pool = torch.cuda.graph_pool_handle()
+        
+        for batch_size in GRAPH_BATCH_SIZES:
+            for length in LENGTH_BUCKETS:
+                static_ids = torch.full((batch_size, length), pad_token_id, dtype=torch.long, device=self.device)
+                static_mask = torch.ones((batch_size, length), dtype=torch.long, device=self.device)
+                
+                # Warm up on a side stream so lazy initialization is not captured
+                stream = torch.cuda.Stream()
+                stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(stream), torch.no_grad():
+                    for _ in range(GRAPH_WARMUP_ITERS):
+                        self.model(input_ids=static_ids, attention_mask=static_mask)
+                torch.cuda.current_stream().wait_stream(stream)
+                
+                graph = torch.cuda.CUDAGraph()
+                with torch.no_grad(), torch.cuda.graph(graph, pool=pool):
+                    static_logits = self.model(input_ids=static_ids, attention_mask=static_mask)["logits"]
+                self.graphs[(batch_size, length)] = (graph, static_ids, static_mask, static_logits)
+        
+        print(f"📸 Captured {len(self.graphs)} CUDA Graphs")
+    
+    def forward_logits(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """Run the classifier, replaying a captured CUDA Graph when a bucket fits."""
+        if self.ort_session is not None:
+            return self.forward_logits_onnx(input_ids, attention_mask)
+        
+        batch_size, length = input_ids.shape
+        graph_batch = next((b for b in GRAPH_BATCH_SIZES if b >= batch_size), None)
+        graph_length = next((n for n in LENGTH_BUCKETS if n >= length), None)
+        
+        if USE_TORCH_COMPILE and graph_batch is not None and length == graph_length:
+            # Pad rows up to a compiled batch size so no new shapes trigger recompilation
+            pad_rows = graph_batch - batch_size
+            if pad_rows:
+                input_ids = torch.cat([input_ids, input_ids.new_full((pad_rows, length), self.tokenizer.pad_token_id)])
+                attention_mask = torch.cat([attention_mask, attention_mask.new_zeros((pad_rows, length))])
+            with torch.inference_mode():
+                # Cloned because reduce-overhead outputs are overwritten by the next replay
+                return self.model(input_ids=input_ids, attention_mask=attention_mask)["logits"][:batch_size].clone()
+        
+        bucket = self.graphs.get((graph_batch, graph_length))
+        
+        if bucket is None:
+            with torch.inference_mode():
+                return self.model(input_ids=input_ids, attention_mask=attention_mask)["logits"]
+        
+        graph, static_ids, static_mask, static_logits = bucket
+        with self.graph_lock:
+            # Padding rows and columns are fully masked out and their logits discarded
+            static_ids.fill_(self.tokenizer.pad_token_id)
+            static_mask.zero_()
+            static_ids[:batch_size, :length].copy_(input_ids)
+            static_mask[:batch_size, :length].copy_(attention_mask)
+            graph.replay()
+            return static_logits[:batch_size].clone()
+    
+    def forward_bucketed(self, texts: List[str]) -> torch.Tensor:
+        """Compute logits with texts grouped into length buckets, each padded to its bucket length."""
+        # Tokenize once without padding to learn each text's length
+        encodings = self.tokenizer(
+            texts,
+            truncation=True,
+            max_length=LENGTH_BUCKETS[-1],
+            return_attention_mask=True,
+            return_token_type_ids=False
+        )
+        
+        buckets: Dict[int, List[int]] = {}
+        for row, ids in enumerate(encodings["input_ids"]):
+            bucket_length = next(n for n in LENGTH_BUCKETS if n >= len(ids))
+            buckets.setdefault(bucket_length, []).append(row)
+        
+        logits = None
+        for bucket_length, rows in buckets.items():
+            inputs = self.tokenizer.pad(
+                {
+                    "input_ids": [encodings["input_ids"][row] for row in rows],
+                    "attention_mask": [encodings["attention_mask"][row] for row in rows]
+                },
+                padding="max_length",
+                max_length=bucket_length,
+                return_tensors="np"
+            )
+            staging_ids, staging_mask = self.pinned.get(bucket_length, (None, None))
+            bucket_logits = self.forward_logits(
+                self.to_device(inputs["input_ids"], staging_ids),
+                self.to_device(inputs["attention_mask"], staging_mask)
+            )
             
-        try:
-            start_time = time.time()
-            
-            # Tokenize input
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                padding=True,
-                max_length=512
-            ).to(self.device)
-            
-            # Predict
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs["logits"]
-                probabilities = torch.softmax(logits, dim=-1)
-                predicted_class_id = torch.argmax(probabilities, dim=-1).item()
-                confidence = probabilities[0][predicted_class_id].item()
-            
-            # Get class label
-            predicted_label = self.label_encoder.inverse_transform([predicted_class_id])[0]
-            
-            processing_time = time.time() - start_time
-            
-            return {
+            # Scatter bucket results back to the original request order
+            if logits is None:
+                logits = bucket_logits.new_empty((len(texts), bucket_logits.shape[-1]))
+            logits[torch.tensor(rows, device=self.device)] = bucket_logits
+        return logits
+    
+    def classify_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classify intents of several texts with one forward pass per length bucket."""
+        start_time = time.time()
+        
+        # Predict
+        with torch.inference_mode():
+            logits = self.forward_bucketed(texts)
+            # Upcast before softmax for numerical safety under FP16
+            probabilities = torch.softmax(logits.float(), dim=-1)
+        
+        # Single device-to-host transfer; everything below works on Python lists
+        probabilities = probabilities.cpu().tolist()
+        
+        processing_time = time.time() - start_time
+        
+        results = []
+        for probs in probabilities:
+            predicted_class_id = max(range(len(probs)), key=probs.__getitem__)
+            confidence = probs[predicted_class_id]
+            
+            results.append({
                 "class_id": predicted_class_id + 1,  # Convert to 1-4 range
-                "class_label": predicted_label,
+                "class_label": self.classes[predicted_class_id],
                 "confidence": round(confidence, 4),
                 "processing_time": round(processing_time, 4),
-                "probabilities": {
-                    self.label_encoder.inverse_transform([i])[0]: round(probabilities[0][i].item(), 4)
-                    for i in range(len(self.label_encoder.classes_))
-                }
-            }
+                # Raw per-class list; only turned into a labeled dict for callers that ask
+                "probabilities": probs
+            })
+        return results
+    
+    def with_probabilities(self, result: Dict[str, Any], include_probabilities: bool) -> Dict[str, Any]:
+        """Label and round the class distribution, or drop it when the caller only needs the top class."""
+        probs = result["probabilities"]
+        result = dict(result)
+        result["probabilities"] = (
+            {label: round(p, 4) for label, p in zip(self.classes, probs)} if include_probabilities else None
+        )
+        return result
+    
+    @staticmethod
+    def cache_key(text: str) -> bytes:
+        return hashlib.blake2b(text.strip().lower().encode("utf-8"), digest_size=16).digest()
+    
+    def get_cached(self, text: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached classification, or None on a miss."""
+        key = self.cache_key(text)
+        result = self.cache.get(key)
+        if result is None:
+            return None
+        self.cache.move_to_end(key)
+        result = copy.deepcopy(result)
+        result["processing_time"] = 0.0
+        return result
+    
+    def store_cached(self, text: str, result: Dict[str, Any]):
+        """Remember a classification, evicting the least recently used entry when full."""
+        self.cache[self.cache_key(text)] = copy.deepcopy(result)
+        if len(self.cache) > CACHE_MAX_SIZE:
+            self.cache.popitem(last=False)
+    
+    def classify_intent(self, text: str, include_probabilities: bool = True) -> Dict[str, Any]:
+        """Classify intent of input text."""
+        if not self.model_loaded or not self.tokenizer or not self.classes:
+            raise HTTPException(status_code=500, detail="Model not loaded")
+        
+        cached = self.get_cached(text)
+        if cached is not None:
+            return self.with_probabilities(cached, include_probabilities)
+            
+        try:
+            result = self.classify_batch([text])[0]
+            self.store_cached(text, result)
+            return self.with_probabilities(result, include_probabilities)
             
         except Exception as e:
-            print(f"❌ Classification failed: {str(e)}")
+            logger.warning(f"Classification failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
+    
+    async def classify_intent_batched(self, text: str, include_probabilities: bool = False) -> Dict[str, Any]:
+        """Queue text for the batch worker and wait for its classification."""
+        if not self.model_loaded or not self.tokenizer or not self.classes or self.queue is None:
+            raise HTTPException(status_code=500, detail="Model not loaded")
+        
+        cached = self.get_cached(text)
+        if cached is not None:
+            return self.with_probabilities(cached, include_probabilities)
+        
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        result = await future
+        self.store_cached(text, result)
+        return self.with_probabilities(result, include_probabilities)
+    
+    async def batch_worker(self):
+        """Collect queued requests into micro-batches and classify them together."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            
+            # Drain more requests until the batch is full or the wait window closes
+            deadline = loop.time() + BATCH_WAIT_SECONDS
+            while len(batch) < MAX_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            texts = [text for text, _ in batch]
+            try:
+                # Run the forward pass off the event loop so new requests keep queuing
+                results = await loop.run_in_executor(None, self.classify_batch, texts)
+            except Exception as e:
+                logger.warning(f"Classification failed: {str(e)}")
+                error = HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
 
 # Initialize FastAPI app and classifier service
 app = FastAPI(
@@ -148,13 +461,20 @@ classifier_service = IntentClassifierService()
 # Request/Response models
 class ClassifyRequest(BaseModel):
     text: str
+    include_probabilities: bool = False  # Full class distribution; off since callers read only the top class
     
 class ClassifyResponse(BaseModel):
     class_id: int
     class_label: str
     confidence: float
     processing_time: float
-    probabilities: Dict[str, float]
+    probabilities: Optional[Dict[str, float]] = None
+
+@app.on_event("startup")
+async def start_batch_worker():
+    """Start the background micro-batching worker."""
+    classifier_service.queue = asyncio.Queue()
+    asyncio.create_task(classifier_service.batch_worker())
 
 @app.get("/health")
 def health_check():
@@ -162,24 +482,30 @@ def health_check():
     return {
         "status": "healthy",
         "device": str(classifier_service.device),
-        "model_loaded": classifier_service.model is not None
+        "model_loaded": classifier_service.model_loaded,
+        "backend": "onnxruntime" if classifier_service.ort_session is not None else "torch"
     }
 
-@app.post("/classify", response_model=ClassifyResponse)
-def classify_text(request: ClassifyRequest) -> ClassifyResponse:
+@app.post("/classify", response_model=ClassifyResponse, response_model_exclude_none=True)
+async def classify_text(request: ClassifyRequest) -> ClassifyResponse:
     """Classify intent of input text."""
     if not request.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
         
-    result = classifier_service.classify_intent(request.text)
+    result = await classifier_service.classify_intent_batched(request.text, request.include_probabilities)
     return ClassifyResponse(**result)
 
 @app.get("/classes")
 def get_classes():
-    """Get available classification classes."""
-    if classifier_service.label_encoder:
+    """Get available classification classes.
+
+    /classify returns class_id, class_label and confidence; the per-class
+    probabilities keyed by these labels are included only when the request
+    sets include_probabilities.
+    """
+    if classifier_service.classes:
         return {
-            "classes": list(classifier_service.label_encoder.classes_),
+            "classes": classifier_service.classes,
             "mapping": {
                 "1": "arxiv_only",
                 "2": "arxiv_web_hybrid", 
@@ -191,10 +517,20 @@ def get_classes():
 
 if __name__ == "__main__":
     print("🚀 Starting XLM-RoBERTa Intent Classification Server...")
+    # Extra workers each load their own model copy; only worthwhile for CPU serving
+    workers = int(os.environ.get("WORKERS", "1"))
+    if workers > 1 and torch.cuda.is_available():
+        # On GPU one process with the batch worker already fans requests into shared batches;
+        # more processes would duplicate weights in GPU memory and contend for the device
+        logger.warning(f"WORKERS={workers} ignored on CUDA; serving from a single process")
+        workers = 1
     uvicorn.run(
-        app,
+        # Multiple workers need an import string; a single worker reuses the already loaded app
+        "intent_server:app" if workers > 1 else app,
         host="0.0.0.0",
         port=8762,
         reload=False,
-        log_level="info"
+        workers=workers,
+        log_level="warning",
+        access_log=False
     )
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 from enum import Enum
+from functools import cache
 from pydantic import BaseModel, Field
 from typing import Any, Optional, Literal
 
@@ -95,6 +96,13 @@ class Configuration(BaseModel):
         description="Level of detail to capture in memories"
     )
     
+    # Prompt cache settings
+    prompt_cache_enabled: bool = Field(
+        default=True,
+        title="Enable Prompt Cache",
+        description="Reuse LLM responses for identical deterministic prompts within the process"
+    )
+    
     # LangGraph execution settings
     recursion_limit: int = Field(
         default=50,
@@ -110,29 +118,50 @@ class Configuration(BaseModel):
         configurable = (
             config["configurable"] if config and "configurable" in config else {}
         )
-        
-        # Get raw values from environment or config
-        raw_values: dict[str, Any] = {
-            name: os.environ.get(name.upper(), configurable.get(name))
-            for name in cls.model_fields.keys()
-        }
-        
-        # Filter out None values and convert string values for environment variables
+        if _FIELD_NAMES.isdisjoint(configurable):
+            # Only LangGraph's own keys: every value comes from the environment
+            return cls.from_env()
+        # Config values may come from users, so these go through full validation
+        return cls(**cls._collect_values(configurable))
+
+    @classmethod
+    def from_env(cls) -> "Configuration":
+        """Create a Configuration instance from environment variables only."""
+        # Validated once per class and copied, so callers never share or re-validate it
+        return _validated_from_env(cls).model_copy()
+
+    @staticmethod
+    def _collect_values(configurable: dict[str, Any]) -> dict[str, Any]:
+        """Read each field from the environment first, then from the config."""
+        # Environment strings are converted by the field's precomputed kind
         values = {}
-        for k, v in raw_values.items():
-            if v is not None:
-                # Handle boolean conversion from environment variables
-                if isinstance(v, str):
-                    field = cls.model_fields.get(k)
-                    if field and field.annotation in [bool, Optional[bool]]:
-                        # Convert string to boolean
-                        v = v.lower() in ('true', '1', 'yes', 'on', 'enabled')
-                    elif field and field.annotation == int:
-                        # Convert string to int
-                        try:
-                            v = int(v)
-                        except ValueError:
-                            continue  # Skip invalid int values
-                values[k] = v
-        
-        return cls(**values)
+        for name, env_name, is_bool, is_int in _FIELD_SPECS:
+            v = os.environ.get(env_name, configurable.get(name))
+            if v is None:
+                continue
+            if isinstance(v, str):
+                if is_bool:
+                    v = v.lower() in ('true', '1', 'yes', 'on', 'enabled')
+                elif is_int:
+                    try:
+                        v = int(v)
+                    except ValueError:
+                        continue  # Skip invalid int values
+            values[name] = v
+        return values
+
+# Field name, environment variable and string-conversion kind, resolved once
+# instead of reflecting over model_fields on every from_runnable_config call
+_FIELD_SPECS = tuple(
+    (name, name.upper(), field.annotation in (bool, Optional[bool]), field.annotation is int)
+    for name, field in Configuration.model_fields.items()
+)
+_FIELD_NAMES = frozenset(name for name, _, _, _ in _FIELD_SPECS)
+
+@cache
+def _validated_from_env(cls: type[Configuration]) -> Configuration:
+    """Build and validate the environment-only configuration once per class."""
+    return cls(**cls._collect_values({}))
+
+# Validate the defaults once so schema mistakes surface at import, not mid-run
+Configuration()
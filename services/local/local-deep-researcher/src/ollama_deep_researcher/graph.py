@@ -9,10 +9,11 @@ from langchain_ollama import ChatOllama
 from langgraph.graph import START, END, StateGraph
 
 from ollama_deep_researcher.configuration import Configuration, SearchAPI
-from ollama_deep_researcher.utils import deduplicate_and_format_sources, format_sources, searxng_search, strip_thinking_tokens, get_config_value, analyze_user_input, fetch_url_content_directly, parallel_search_coordinator
+from ollama_deep_researcher.utils import deduplicate_and_format_sources, format_sources, searxng_search, strip_thinking_tokens, get_config_value, analyze_user_input, fetch_url_content_directly, parallel_search_queries
 from ollama_deep_researcher.intent_classifier import classify_query_intent, intent_rule_based
 from ollama_deep_researcher.state import SummaryState, SummaryStateInput, SummaryStateOutput
-from ollama_deep_researcher.prompts import query_writer_instructions, summarizer_instructions, reflection_instructions, report_generation_instructions, chain_of_verification_instructions, verification_synthesis_instructions, get_current_date
+from ollama_deep_researcher.prompts import render, get_current_date, detect_language, language_guidance
+from ollama_deep_researcher import prompt_cache
 from ollama_deep_researcher.openai_compatible import ChatOpenAICompatible
 from ollama_deep_researcher.memory_client import (
     MemoryCapture, 
@@ -21,6 +22,7 @@ from ollama_deep_researcher.memory_client import (
     capture_memory_safe,
     get_memory_client
 )
+from ollama_deep_researcher.openwebui_integration import cleanup_integration
 from ollama_deep_researcher.tool_manager import (
     tool_manager, 
     get_tools_for_llm, 
@@ -29,6 +31,34 @@ from ollama_deep_researcher.tool_manager import (
     is_openwebui_initialized
 )
 
+def invoke_prompt(llm, configurable: Configuration, template_name: str, human_content: str, **prompt_kwargs) -> str:
+    """Invoke the LLM with a rendered prompt template and return the response text.
+    
+    Identical deterministic calls (same template arguments, model and human message)
+    are answered from the prompt cache without rendering or calling the LLM.
+    """
+    if not configurable.prompt_cache_enabled:
+        result = llm.invoke(
+            [SystemMessage(content=render(template_name, **prompt_kwargs)),
+            HumanMessage(content=human_content)]
+        )
+        return result.content
+    
+    base_url = (configurable.openai_compatible_base_url if configurable.llm_provider == "openai_compatible"
+                else configurable.ollama_base_url)
+    # The date is baked into rendered prompts, so it is part of the cache key too
+    context = (configurable.llm_provider, base_url, configurable.local_llm, human_content, get_current_date())
+    cached = prompt_cache.lookup(template_name, prompt_kwargs, context)
+    if cached is not None:
+        return cached
+    
+    result = llm.invoke(
+        [SystemMessage(content=render(template_name, **prompt_kwargs)),
+        HumanMessage(content=human_content)]
+    )
+    prompt_cache.store(template_name, prompt_kwargs, result.content, context)
+    return result.content
+
 # Nodes
 def classify_intent(state: SummaryState, config: RunnableConfig):
     """Simplified LangGraph node that analyzes user input for web search.
@@ -350,11 +380,15 @@ Respond ONLY with the JSON object, no other text."""
     except Exception as e:
         print(f"❌ Tool-enhanced research failed: {str(e)}")
         return {"tool_results": [], "enhanced_context": ""}
-    
+
+async def _tool_enhanced_research_in_loop(state: SummaryState, config: RunnableConfig):
+    """Run tool-enhanced research, then close the HTTP clients bound to this event loop"""
+    try:
+        return await _tool_enhanced_research_async(state, config)
     finally:
-        # Don't clean up sessions here - they might be needed for subsequent calls
-        # Sessions will be cleaned up when the process ends or explicitly called
-        pass
+        # Each research loop gets a new asyncio.run() loop; close the pooled tool-server
+        # clients before it ends so they don't leak into the next loop
+        await cleanup_integration()
 
 def tool_enhanced_research(state: SummaryState, config: RunnableConfig):
     """LangGraph node that performs tool-enhanced research using dynamic tool calling.
@@ -370,7 +404,7 @@ def tool_enhanced_research(state: SummaryState, config: RunnableConfig):
         Dictionary with state update, including tool_results and enhanced_context
     """
     # Run the async function synchronously
-    return asyncio.run(_tool_enhanced_research_async(state, config))
+    return asyncio.run(_tool_enhanced_research_in_loop(state, config))
 
 def generate_query(state: SummaryState, config: RunnableConfig):
     """LangGraph node that generates a search query based on the research topic.
@@ -390,9 +424,6 @@ def generate_query(state: SummaryState, config: RunnableConfig):
     # Check if we already have URL content to inform the query
     has_url_content = len(state.web_research_results) > 0
     
-    # Format the enhanced prompt with full context
-    current_date = get_current_date()
-    
     if has_url_content:
         # Extract key information from the fetched content to inform the query
         fetched_content = state.web_research_results[0][:2000]  # First 2000 chars of fetched content
@@ -407,16 +438,10 @@ FETCHED CONTENT SUMMARY:
 
 IMPORTANT: Stay focused on the original research topic: {state.research_topic}"""
         
-        formatted_prompt = query_writer_instructions.format(
-            current_date=current_date,
-            research_topic=research_context
-        )
+        prompt_topic = research_context
     else:
         # Standard query generation with topic focus
-        formatted_prompt = query_writer_instructions.format(
-            current_date=current_date,
-            research_topic=state.research_topic
-        )
+        prompt_topic = state.research_topic
 
     # Generate a query
     configurable = Configuration.from_runnable_config(config)
@@ -439,13 +464,11 @@ IMPORTANT: Stay focused on the original research topic: {state.research_topic}""
             format="json"
         )
     
-    result = llm_json_mode.invoke(
-        [SystemMessage(content=formatted_prompt),
-        HumanMessage(content=f"Generate a query for web search:")]
+    content = invoke_prompt(
+        llm_json_mode, configurable, "query_writer",
+        "Generate a query for web search:",
+        research_topic=prompt_topic
     )
-    
-    # Get the content
-    content = result.content
 
     # Parse the JSON response and get the query
     try:
@@ -542,6 +565,13 @@ def web_research(state: SummaryState, config: RunnableConfig):
     print(f"🔄 Research Loop {state.research_loop_count + 1} - {state.search_strategy}")
     print(f"🔍 Query: {state.search_query}")
     
+    # The query writer may return a list of up to 3 queries; search them together
+    # and summarize the combined results once
+    if isinstance(state.search_query, list):
+        queries = [str(q) for q in state.search_query[:3] if q] or [state.research_topic]
+    else:
+        queries = [state.search_query]
+    
     # Configure
     configurable = Configuration.from_runnable_config(config)
     
@@ -551,8 +581,8 @@ def web_research(state: SummaryState, config: RunnableConfig):
         
         if search_api == "mcp":
             print("🔬 Using MCP search for ArXiv papers")
-            search_results = parallel_search_coordinator(
-                state.search_query,
+            batch_results = parallel_search_queries(
+                queries,
                 search_strategy="mcp",
                 max_results=5,
                 fetch_full_page=configurable.fetch_full_page,
@@ -560,13 +590,24 @@ def web_research(state: SummaryState, config: RunnableConfig):
             )
         else:
             print("🌐 Using SearXNG web search")
-            search_results = parallel_search_coordinator(
-                state.search_query,
+            batch_results = parallel_search_queries(
+                queries,
                 search_strategy="web_search",
                 max_results=5,
                 fetch_full_page=configurable.fetch_full_page
             )
         
+        # Merge per-query results, keeping the first occurrence of each URL
+        merged_results = []
+        seen_urls = set()
+        for query_results in batch_results:
+            for result in (query_results or {}).get("results", []):
+                url = result.get("url")
+                if url not in seen_urls:
+                    seen_urls.add(url)
+                    merged_results.append(result)
+        search_results = {"results": merged_results}
+        
         # Format search results
         search_str = deduplicate_and_format_sources(
             search_results, 
@@ -587,7 +628,7 @@ def web_research(state: SummaryState, config: RunnableConfig):
     except Exception as e:
         print(f"❌ Search failed, using fallback: {str(e)}")
         # Fallback to basic SearXNG
-        search_results = searxng_search(state.search_query, max_results=3, fetch_full_page=configurable.fetch_full_page)
+        search_results = searxng_search(queries[0], max_results=3, fetch_full_page=configurable.fetch_full_page)
         search_str = deduplicate_and_format_sources(search_results, max_tokens_per_source=1000, fetch_full_page=configurable.fetch_full_page)
         
         return {
@@ -665,18 +706,16 @@ def summarize_sources(state: SummaryState, config: RunnableConfig):
             temperature=0
         )
     
-    # Format the summarizer instructions with research topic for language detection
-    formatted_summarizer_instructions = summarizer_instructions.format(
-        research_topic=state.research_topic
-    )
-    
-    result = llm.invoke(
-        [SystemMessage(content=formatted_summarizer_instructions),
-        HumanMessage(content=human_message_content)]
+    # Response language is decided here rather than by the LLM from the topic
+    target_language = detect_language(state.research_topic)
+    running_summary = invoke_prompt(
+        llm, configurable, "summarizer", human_message_content,
+        research_topic=state.research_topic,
+        target_language=target_language,
+        language_guidance=language_guidance("summarizer", target_language)
     )
 
     # Strip thinking tokens if configured
-    running_summary = result.content
     if configurable.strip_thinking_tokens:
         running_summary = strip_thinking_tokens(running_summary)
 
@@ -728,20 +767,16 @@ def generate_verification_questions(state: SummaryState, config: RunnableConfig)
             format="json"
         )
     
-    # Format the prompt
-    formatted_prompt = chain_of_verification_instructions.format(
+    content = invoke_prompt(
+        llm_json_mode, configurable, "chain_of_verification",
+        "Generate verification questions for the research summary.",
         research_topic=state.research_topic,
         current_summary=state.running_summary
     )
     
-    result = llm_json_mode.invoke([
-        SystemMessage(content=formatted_prompt),
-        HumanMessage(content="Generate verification questions for the research summary.")
-    ])
-    
     # Parse the JSON response
     try:
-        content = result.content.strip()
+        content = content.strip()
         # Try to extract JSON if it's embedded in other text
         if content and not content.startswith('{'):
             json_start = content.find('{')
@@ -784,17 +819,22 @@ def verify_research_claims(state: SummaryState, config: RunnableConfig):
     verification_results = []
     
     # Limit to first 3 verification questions to avoid excessive searches
-    for i, question in enumerate(state.verification_questions[:3]):
+    questions = state.verification_questions[:3]
+    for i, question in enumerate(questions):
+        print(f"Verifying claim {i+1}: {question}")
+    
+    # Search all questions concurrently with focused results
+    batch_results = parallel_search_queries(
+        questions,
+        "web_search",  # Use web search for verification
+        max_results=2,  # Fewer results for verification
+        fetch_full_page=configurable.fetch_full_page
+    )
+    
+    for i, (question, search_results) in enumerate(zip(questions, batch_results)):
         try:
-            print(f"Verifying claim {i+1}: {question}")
-            
-            # Use parallel search for verification with focused results
-            search_results = parallel_search_coordinator(
-                question, 
-                "web_search",  # Use web search for verification
-                max_results=2,  # Fewer results for verification
-                fetch_full_page=configurable.fetch_full_page
-            )
+            if search_results is None:
+                raise RuntimeError("search returned no response")
             
             # Format verification result
             search_str = deduplicate_and_format_sources(
@@ -868,7 +908,8 @@ def synthesize_with_verification(state: SummaryState, config: RunnableConfig):
         verification_context += f"Findings: {result['search_results']}\n"
     
     # Format the system prompt
-    formatted_prompt = verification_synthesis_instructions.format(
+    formatted_prompt = render(
+        "verification_synthesis",
         research_topic=state.research_topic,
         summary_length=len(state.running_summary)
     )
@@ -939,21 +980,18 @@ def reflect_on_summary(state: SummaryState, config: RunnableConfig):
             format="json"
         )
     
-    # Format the reflection prompt with summaries
-    formatted_reflection_prompt = reflection_instructions.format(
+    # Reflection prompt takes the summaries
+    content = invoke_prompt(
+        llm_json_mode, configurable, "reflection",
+        f"Analyze the summary and generate a follow-up query that stays focused on the original research topic: {state.research_topic}",
         research_topic=state.research_topic,
         summaries=state.running_summary
     )
     
-    result = llm_json_mode.invoke(
-        [SystemMessage(content=formatted_reflection_prompt),
-        HumanMessage(content=f"Analyze the summary and generate a follow-up query that stays focused on the original research topic: {state.research_topic}")]
-    )
-    
     # Strip thinking tokens if configured
     try:
         # Clean the content first - remove any leading/trailing whitespace
-        content = result.content.strip()
+        content = content.strip()
         # Try to extract JSON if it's embedded in other text
         if content and not content.startswith('{'):
             json_start = content.find('{')
@@ -1123,9 +1161,6 @@ def finalize_summary(state: SummaryState, config: RunnableConfig):
     
     print("=" * 80)
     
-    # Prepare context for the LLM
-    current_date = get_current_date()
-    
     # Format all web research results for context
     all_research_context = "\n\n".join([
         f"<Research Round {i+1}>\n{result}\n</Research Round {i+1}>"
@@ -1153,10 +1188,13 @@ Please generate a comprehensive research report based on this information. The r
 """
 
     # Format the system prompt
-    formatted_prompt = report_generation_instructions.format(
+    target_language = detect_language(state.research_topic)
+    formatted_prompt = render(
+        "report_generation",
         research_topic=state.research_topic,
-        current_date=current_date,
-        research_loop_count=state.research_loop_count
+        research_loop_count=state.research_loop_count,
+        target_language=target_language,
+        language_guidance=language_guidance("report_generation", target_language)
     )
 
     # Get the LLM configuration
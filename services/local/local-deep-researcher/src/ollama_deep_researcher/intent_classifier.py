@@ -3,15 +3,51 @@ Intent Classifier for web research only.
 Uses rule-based classification optimized for web search workflows.
 """
 
+import copy
 import re
 import time
 import logging
-import requests
+import httpx
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from .configuration import Configuration
 
 logger = logging.getLogger("ollama_deep_researcher.intent_classifier")
 
+URL_RE = re.compile(r'https?://[^\s<>"\'{}|\\^`\[\]]+')
+
+# Direct content request indicators (English and Thai)
+DIRECT_INDICATOR_PATTERNS = [
+    # English patterns
+    r'\b(?:analyze|explain|summarize|review|examine|elaborate)\s+(?:this\s+)?(?:url|link|page|website|article)',
+    r'\b(?:what|how)\s+(?:is|does|are)\s+(?:this|that)',
+    r'\btell\s+me\s+about\s+(?:this|that)',
+    r'\b(?:analyze|explain|summarize|elaborate|extract|interpret|decode|parse|process|digest|break down|break-down|breakdown|dissect|evaluate|assess|study|investigate|research|explore|examine|inspect|scrutinize|describe|detail|outline|overview|review|read|scan|understand|comprehend|grasp|decipher|translate|convert|transform|simplify|clarify|elucidate|expound|expand|discuss)\s+(?:https?://|www\.)',
+    
+    # Thai patterns
+    r'(?:วิเคราะห์|อธิบาย|สรุป|ทบทวน|ตรวจสอบ)\s*(?:นี้\s*)?(?:url|ลิงก์|ลิงค์|หน้า|เว็บไซต์|เว็บ|บทความ)',
+    r'(?:อะไร|ยังไง|เป็นยังไง|คืออะไร)\s*(?:คือ|เป็น)?\s*(?:นี่|นั่น|ของนี้)',
+    r'(?:บอก|เล่า|อธิบาย|ขยายความ)(?:ให้|กับ)?(?:ฉัน|เรา|ผม)?\s*(?:เกี่ยวกับ|ถึง)?\s*(?:นี่|นั่น|ของนี้)',
+    r'(?:วิเคราะห์|อธิบาย|สรุป|ขยายความ)\s*(?:https?://|www\.)',
+    r'(?:ช่วย)?(?:วิเคราะห์|อธิบาย|สรุป|ทบทวน|ขยายความ)\s*(?:เนื้อหา|ข้อมูล)?\s*(?:ใน|จาก)?\s*(?:ลิงก์|ลิงค์|เว็บไซต์)',
+]
+
+# All indicators merged into one alternation so a query is scanned once
+DIRECT_REQUEST_RE = re.compile("|".join(f"(?:{p})" for p in DIRECT_INDICATOR_PATTERNS), re.IGNORECASE)
+
+ML_API_URL = "http://localhost:8762"
+
+# Shared across classifier instances, which are created per query
+ML_CACHE_MAX_SIZE = 4096
+_ml_result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Pooled keep-alive client so each classification reuses an open connection
+_ml_client = httpx.Client(
+    base_url=ML_API_URL,
+    timeout=5.0,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+)
+
 class IntentClassifier:
     """Rule-based intent classifier for web search only."""
     
@@ -22,26 +58,10 @@ class IntentClassifier:
         start_time = time.time()
         
         # Check if URL is present for direct content fetch
-        url_pattern = r'https?://[^\s<>"\'{}|\\^`\[\]]+'
-        has_url = bool(re.search(url_pattern, text))
+        has_url = bool(URL_RE.search(text))
         
         # Check for direct content request indicators (English and Thai)
-        direct_indicators = [
-            # English patterns
-            r'\b(?:analyze|explain|summarize|review|examine|elaborate)\s+(?:this\s+)?(?:url|link|page|website|article)',
-            r'\b(?:what|how)\s+(?:is|does|are)\s+(?:this|that)',
-            r'\btell\s+me\s+about\s+(?:this|that)',
-            r'\b(?:analyze|explain|summarize|elaborate|extract|interpret|decode|parse|process|digest|break down|break-down|breakdown|dissect|evaluate|assess|study|investigate|research|explore|examine|inspect|scrutinize|describe|detail|outline|overview|review|read|scan|understand|comprehend|grasp|decipher|translate|convert|transform|simplify|clarify|elucidate|expound|expand|discuss)\s+(?:https?://|www\.)',
-            
-            # Thai patterns
-            r'(?:วิเคราะห์|อธิบาย|สรุป|ทบทวน|ตรวจสอบ)\s*(?:นี้\s*)?(?:url|ลิงก์|ลิงค์|หน้า|เว็บไซต์|เว็บ|บทความ)',
-            r'(?:อะไร|ยังไง|เป็นยังไง|คืออะไร)\s*(?:คือ|เป็น)?\s*(?:นี่|นั่น|ของนี้)',
-            r'(?:บอก|เล่า|อธิบาย|ขยายความ)(?:ให้|กับ)?(?:ฉัน|เรา|ผม)?\s*(?:เกี่ยวกับ|ถึง)?\s*(?:นี่|นั่น|ของนี้)',
-            r'(?:วิเคราะห์|อธิบาย|สรุป|ขยายความ)\s*(?:https?://|www\.)',
-            r'(?:ช่วย)?(?:วิเคราะห์|อธิบาย|สรุป|ทบทวน|ขยายความ)\s*(?:เนื้อหา|ข้อมูล)?\s*(?:ใน|จาก)?\s*(?:ลิงก์|ลิงค์|เว็บไซต์)',
-        ]
-        
-        is_direct_request = any(re.search(pattern, text, re.IGNORECASE) for pattern in direct_indicators)
+        is_direct_request = bool(DIRECT_REQUEST_RE.search(text))
         
         # Determine strategy
         if has_url and is_direct_request:
@@ -74,16 +94,26 @@ class MLIntentClassifier:
     
     def __init__(self, config: Configuration):
         self.simple_classifier = IntentClassifier(config)
-        self.ml_api_url = "http://localhost:8762"
+        self.ml_api_url = ML_API_URL
         
     def _classify_with_ml(self, text: str) -> Optional[Dict[str, Any]]:
+        """Call XLM-RoBERTa API to determine search strategy, reusing cached results."""
+        cached = _ml_result_cache.get(text)
+        if cached is not None:
+            _ml_result_cache.move_to_end(text)
+            return copy.deepcopy(cached)
+        
+        result = self._request_ml_classification(text)
+        if result is not None:
+            _ml_result_cache[text] = copy.deepcopy(result)
+            if len(_ml_result_cache) > ML_CACHE_MAX_SIZE:
+                _ml_result_cache.popitem(last=False)
+        return result
+        
+    def _request_ml_classification(self, text: str) -> Optional[Dict[str, Any]]:
         """Call XLM-RoBERTa API to determine search strategy."""
         try:
-            response = requests.post(
-                f"{self.ml_api_url}/classify",
-                json={"text": text},
-                timeout=5
-            )
+            response = _ml_client.post("/classify", json={"text": text})
             
             if response.status_code == 200:
                 result = response.json()
@@ -110,7 +140,7 @@ class MLIntentClassifier:
                     "ml_class_label": result.get("class_label", "unknown")
                 }
                     
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError:
             print("⚠️ ML API unavailable - using fallback")
         except Exception as e:
             print(f"⚠️ ML API error: {str(e)}")
@@ -150,8 +180,7 @@ def classify_query_intent(text: str, config: Configuration) -> Dict[str, Any]:
 # Rule-based function
 def intent_rule_based(research_topic: str) -> Dict[str, Any]:
     # Check for URL
-    url_pattern = r'https?://[^\s<>"\'{}|\\^`\[\]]+'
-    has_url = bool(re.search(url_pattern, research_topic))
+    has_url = bool(URL_RE.search(research_topic))
     
     if has_url:
         return {
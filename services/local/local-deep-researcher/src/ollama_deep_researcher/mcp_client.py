@@ -5,16 +5,143 @@ Based on OpenWebUI's external tool integration patterns, this module provides
 MCP (Model Context Protocol) client functionality for connecting to ArXiv MCP servers.
 """
 
+import codecs
+import copy
 import json
+import random
+import sys
+import threading
+import time
 import asyncio
 import aiohttp
 import logging
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Any, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_CONCURRENT = 8  # Sub-calls the server runs in parallel for one batch_execute request
+
+# Client-side batching of call_tool submissions
+BATCH_MAX_SIZE = 16  # Maximum calls flushed in one request
+BATCH_WINDOW_SECONDS = 0.005  # How long to wait for more calls before flushing
+
+# Retry policy for a single tool call: short jittered backoff, transient failures only
+RETRYABLE_STATUSES = frozenset({408, 429})  # Retried in addition to every 5xx
+RETRY_BASE_DELAY = 0.1
+RETRY_MAX_DELAY = 2.0
+RETRY_JITTER = 0.05
+
+STREAM_CHUNK_SIZE = 65536  # Bytes read per chunk when streaming large tool responses
+
+# In-memory LRU cache of read-only tool results (error payloads are never cached)
+CACHEABLE_TOOLS = frozenset({"search_papers", "list_papers", "read_paper"})
+CACHE_MAX_SIZE = 512
+CACHE_TTL_SECONDS = 300
+
+# MCP traffic runs on one private event loop thread: graph nodes call in through
+# short-lived asyncio.run() loops (several at once from search worker threads), and
+# the pooled session and connected clients must outlive every one of them
+_io_loop: Optional[asyncio.AbstractEventLoop] = None
+_io_loop_lock = threading.Lock()
+
+# One pooled HTTP session shared by every MCP client on the I/O loop, so repeated
+# tool calls reuse keep-alive connections instead of reconnecting per client
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+# Connected clients reused by create_mcp_client, keyed by server configuration
+_clients: Dict[tuple, "MCPClient"] = {}
+
+# Connection pool sizing for parallel paper downloads against one ArXiv MCP server
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 50
+KEEPALIVE_TIMEOUT = 120  # Outlive pauses between research loops so idle connections skip new TLS handshakes
+DNS_CACHE_TTL = 300
+
+def _get_io_loop() -> asyncio.AbstractEventLoop:
+    """Start the MCP I/O loop thread on first use"""
+    global _io_loop
+    with _io_loop_lock:
+        if _io_loop is None:
+            # uvloop's faster socket and timer handling, for this private loop only
+            _io_loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=_io_loop.run_forever, name="mcp-client-io", daemon=True).start()
+    return _io_loop
+
+async def _run_on_io_loop(coro):
+    """Run a coroutine on the MCP I/O loop and await it from the caller's loop"""
+    loop = _get_io_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+def get_shared_session(pool_size: int = POOL_LIMIT_PER_HOST) -> aiohttp.ClientSession:
+    """
+    Get the shared aiohttp session, creating it on first use
+    
+    Must be called on the MCP I/O loop, which owns the session for the life of
+    the process. pool_size (connections per host) applies when the session is created.
+    """
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=max(POOL_LIMIT, pool_size),
+                limit_per_host=pool_size,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                force_close=False
+            )
+        )
+    return _shared_session
+
+async def close_shared_session():
+    """Disconnect the cached clients and close the shared session; call on application shutdown"""
+    if _io_loop is not None:
+        await _run_on_io_loop(_close_shared_session())
+
+async def _close_shared_session():
+    global _shared_session
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client._disconnect()
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+
+# slots=True needs Python 3.10+; older interpreters keep regular frozen dataclasses
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+class MCPToolCallError(RuntimeError):
+    """Tool call rejected with a client error that retrying cannot fix"""
+
 class MCPToolType(Enum):
     """MCP Tool Types based on ArXiv MCP Server"""
     SEARCH_PAPERS = "search_papers"
@@ -22,21 +149,99 @@ class MCPToolType(Enum):
     LIST_PAPERS = "list_papers"
     READ_PAPER = "read_paper"
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class MCPToolSpec:
     """MCP Tool Specification"""
     name: str
     description: str
     parameters: Dict[str, Any]
-    required: List[str] = None
+    required: Tuple[str, ...] = field(default_factory=tuple)
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class MCPServerConfig:
     """MCP Server Configuration"""
     url: str
     timeout: int = 30
     max_retries: int = 3
     auth_token: Optional[str] = None
+    pool_size: int = POOL_LIMIT_PER_HOST  # Connections per host in the shared session pool
+
+# Fallback ArXiv MCP tool specs, built once and shared (specs are frozen)
+_DEFAULT_ARXIV_TOOLS: Dict[str, "MCPToolSpec"] = {
+    "search_papers": MCPToolSpec(
+        name="search_papers",
+        description="Search for academic papers on ArXiv",
+        parameters={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query for papers"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return",
+                    "default": 10
+                },
+                "sort_by": {
+                    "type": "string",
+                    "enum": ["relevance", "lastUpdatedDate", "submittedDate"],
+                    "default": "relevance"
+                },
+                "start_date": {
+                    "type": "string",
+                    "description": "Start date for search (YYYY-MM-DD)"
+                },
+                "end_date": {
+                    "type": "string",
+                    "description": "End date for search (YYYY-MM-DD)"
+                },
+                "categories": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "ArXiv categories to search in"
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+    "download_paper": MCPToolSpec(
+        name="download_paper",
+        description="Download a paper by ArXiv ID",
+        parameters={
+            "type": "object",
+            "properties": {
+                "paper_id": {
+                    "type": "string",
+                    "description": "ArXiv paper ID (e.g., '2401.12345')"
+                }
+            },
+            "required": ["paper_id"]
+        }
+    ),
+    "list_papers": MCPToolSpec(
+        name="list_papers",
+        description="List all locally downloaded papers",
+        parameters={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    "read_paper": MCPToolSpec(
+        name="read_paper",
+        description="Read content of a downloaded paper",
+        parameters={
+            "type": "object",
+            "properties": {
+                "paper_id": {
+                    "type": "string",
+                    "description": "ArXiv paper ID to read"
+                }
+            },
+            "required": ["paper_id"]
+        }
+    )
+}
 
 class MCPClient:
     """
@@ -49,11 +254,31 @@ class MCPClient:
     - Authentication and session management
     """
     
-    def __init__(self, config: MCPServerConfig):
+    def __init__(self, config: MCPServerConfig, session: Optional[aiohttp.ClientSession] = None):
         self.config = config
-        self.session: Optional[aiohttp.ClientSession] = None
+        # Endpoint URLs are fixed per server, so build them once
+        self._call_url = f"{config.url}/call"
+        self._tools_url = f"{config.url}/tools"
+        self._batch_url = f"{config.url}/batch"
+        # Injected or shared session; never owned or closed by the client. An injected
+        # session is used on the caller's loop, the shared one on the MCP I/O loop
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._session_injected = session is not None
+        self.timeout = aiohttp.ClientTimeout(total=config.timeout)
+        self.headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'DeepResearcher-MCP-Client/1.0'
+        }
+        if config.auth_token:
+            self.headers['Authorization'] = f'Bearer {config.auth_token}'
         self.tools: Dict[str, MCPToolSpec] = {}
+        self._tools_view = MappingProxyType(self.tools)  # Live read-only view; self.tools is only mutated in place
         self.connected = False
+        self.batch_supported = True  # Cleared once the server shows it has no /batch endpoint
+        self._submit_queue: Optional[asyncio.Queue[Tuple[str, Dict[str, Any], asyncio.Future]]] = None
+        self._submit_task: Optional[asyncio.Task] = None
+        self._flush_tasks: set = set()  # Strong references to in-flight batches
+        self._cache: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
         
     async def __aenter__(self):
         """Async context manager entry"""
@@ -64,26 +289,24 @@ class MCPClient:
         """Async context manager exit"""
         await self.disconnect()
         
+    async def _on_client_loop(self, coro):
+        """Run a coroutine on the loop that owns this client's session"""
+        if self._session_injected:
+            return await coro
+        return await _run_on_io_loop(coro)
+        
     async def connect(self):
         """
         Establish connection to MCP server
         Similar to OpenWebUI's tool server connection pattern
         """
+        await self._on_client_loop(self._connect())
+        
+    async def _connect(self):
         try:
-            # Create session with timeout configuration
-            timeout = aiohttp.ClientTimeout(total=self.config.timeout)
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'DeepResearcher-MCP-Client/1.0'
-            }
-            
-            if self.config.auth_token:
-                headers['Authorization'] = f'Bearer {self.config.auth_token}'
-                
-            self.session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers=headers
-            )
+            # Reuse the pooled session; timeout and headers are sent per request
+            if self.session is None or self.session.closed:
+                self.session = get_shared_session(self.config.pool_size)
             
             # Test connection and discover tools
             await self._discover_tools()
@@ -96,10 +319,24 @@ class MCPClient:
             
     async def disconnect(self):
         """Close connection to MCP server"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self._on_client_loop(self._disconnect())
+        
+    async def _disconnect(self):
         self.connected = False
+        if self._submit_task is not None:
+            self._submit_task.cancel()
+            await asyncio.gather(self._submit_task, return_exceptions=True)
+            self._submit_task = None
+        # Fail calls still waiting in the queue rather than leave their callers hanging
+        if self._submit_queue is not None:
+            while not self._submit_queue.empty():
+                self._fail_disconnected([self._submit_queue.get_nowait()])
+        # In-flight batches fail their own callers when cancelled (see _flush_batch)
+        for task in list(self._flush_tasks):
+            task.cancel()
+        await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        # The session is shared, so only drop the reference (see close_shared_session)
+        self.session = None
         logger.info("Disconnected from MCP server")
         
     async def _discover_tools(self):
@@ -109,9 +346,13 @@ class MCPClient:
         """
         try:
             # Get tools endpoint (standard MCP pattern)
-            async with self.session.get(f"{self.config.url}/tools") as response:
+            async with self.session.get(
+                self._tools_url,
+                headers=self.headers,
+                timeout=self.timeout
+            ) as response:
                 if response.status == 200:
-                    tools_data = await response.json()
+                    tools_data = await response.json(loads=json_loads)
                     await self._parse_tools_spec(tools_data)
                 else:
                     # Fallback: Define ArXiv MCP tools manually
@@ -128,98 +369,141 @@ class MCPClient:
                 name=tool_name,
                 description=tool_spec.get("description", ""),
                 parameters=tool_spec.get("parameters", {}),
-                required=tool_spec.get("required", [])
+                required=tuple(tool_spec.get("required", ()))
             )
             
     async def _load_default_arxiv_tools(self):
         """Load default ArXiv MCP tools specification"""
-        self.tools = {
-            "search_papers": MCPToolSpec(
-                name="search_papers",
-                description="Search for academic papers on ArXiv",
-                parameters={
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Search query for papers"
-                        },
-                        "max_results": {
-                            "type": "integer",
-                            "description": "Maximum number of results to return",
-                            "default": 10
-                        },
-                        "sort_by": {
-                            "type": "string",
-                            "enum": ["relevance", "lastUpdatedDate", "submittedDate"],
-                            "default": "relevance"
-                        },
-                        "start_date": {
-                            "type": "string",
-                            "description": "Start date for search (YYYY-MM-DD)"
-                        },
-                        "end_date": {
-                            "type": "string",
-                            "description": "End date for search (YYYY-MM-DD)"
-                        },
-                        "categories": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "ArXiv categories to search in"
-                        }
-                    },
-                    "required": ["query"]
-                }
-            ),
-            "download_paper": MCPToolSpec(
-                name="download_paper",
-                description="Download a paper by ArXiv ID",
-                parameters={
-                    "type": "object",
-                    "properties": {
-                        "paper_id": {
-                            "type": "string",
-                            "description": "ArXiv paper ID (e.g., '2401.12345')"
-                        }
-                    },
-                    "required": ["paper_id"]
-                }
-            ),
-            "list_papers": MCPToolSpec(
-                name="list_papers",
-                description="List all locally downloaded papers",
-                parameters={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            "read_paper": MCPToolSpec(
-                name="read_paper",
-                description="Read content of a downloaded paper",
-                parameters={
-                    "type": "object",
-                    "properties": {
-                        "paper_id": {
-                            "type": "string",
-                            "description": "ArXiv paper ID to read"
-                        }
-                    },
-                    "required": ["paper_id"]
-                }
-            )
-        }
+        self.tools.clear()
+        self.tools.update(_DEFAULT_ARXIV_TOOLS)
         
-    async def call_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(self, tool_name: str, parameters: Dict[str, Any], cache_disabled: bool = False) -> Dict[str, Any]:
         """
         Call a tool on the MCP server
         Based on OpenWebUI's external tool execution pattern
+        
+        Calls are queued and flushed together, so calls issued in quick succession
+        share one batched request instead of one round trip each. Results of
+        read-only tools are cached; pass cache_disabled=True to force a fresh call.
         """
+        return await self._on_client_loop(self._call_tool(tool_name, parameters, cache_disabled))
+    
+    async def _call_tool(self, tool_name: str, parameters: Dict[str, Any], cache_disabled: bool) -> Dict[str, Any]:
         if not self.connected:
             raise RuntimeError("MCP client not connected")
             
         if tool_name not in self.tools:
             raise ValueError(f"Tool '{tool_name}' not available")
+        
+        cache_key = None
+        if tool_name in CACHEABLE_TOOLS and not cache_disabled:
+            cache_key = self._cache_key(tool_name, parameters)
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                return cached
+        
+        result = await self._submit(tool_name, parameters)
+        self._invalidate_after_download(tool_name, parameters, result)
+        # arxiv-mcp-server reports failures such as "not found in storage" as normal
+        # results; caching them would hide a paper downloaded moments later
+        if cache_key is not None and not _is_error_result(result):
+            self._store_cached(cache_key, result)
+        return result
+    
+    @staticmethod
+    def _cache_key(tool_name: str, parameters: Dict[str, Any]) -> str:
+        return f"{tool_name}:{json.dumps(parameters, sort_keys=True, default=str)}"
+    
+    def _invalidate_after_download(self, tool_name: str, parameters: Dict[str, Any], result: Any):
+        """Drop cached list_papers results and reads of a paper once it has been downloaded"""
+        if tool_name != "download_paper" or _is_error_result(result) or not self._cache:
+            return
+        read_key = self._cache_key("read_paper", {"paper_id": parameters.get("paper_id")})
+        for key in [key for key in self._cache if key.startswith("list_papers:") or key == read_key]:
+            del self._cache[key]
+    
+    def _get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a fresh cached result, or None on a miss"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > CACHE_TTL_SECONDS:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return copy.deepcopy(result)
+    
+    def _store_cached(self, key: str, result: Dict[str, Any]):
+        """Remember a result, evicting the least recently used entry when full"""
+        self._cache[key] = (time.monotonic(), copy.deepcopy(result))
+        self._cache.move_to_end(key)
+        if len(self._cache) > CACHE_MAX_SIZE:
+            self._cache.popitem(last=False)
+    
+    async def _submit(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a call for the batching worker and wait for its result"""
+        if self._submit_task is None or self._submit_task.done():
+            self._submit_queue = asyncio.Queue()
+            self._submit_task = asyncio.create_task(self._submit_worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._submit_queue.put((tool_name, parameters, future))
+        return await future
+    
+    async def _submit_worker(self):
+        """Drain queued tool calls into batches and resolve each caller's future"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._submit_queue.get()]
+            
+            # Collect more calls until the batch is full or the window closes
+            deadline = loop.time() + BATCH_WINDOW_SECONDS
+            try:
+                while len(batch) < BATCH_MAX_SIZE:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._submit_queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                self._fail_disconnected(batch)
+                raise
             
+            # Flush in the background so the next batch can form while this one is in flight
+            task = asyncio.create_task(self._flush_batch(batch))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _flush_batch(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        """Send one batch of queued calls and resolve their futures"""
+        try:
+            results = await self._execute_calls([(tool_name, parameters) for tool_name, parameters, _ in batch])
+        except asyncio.CancelledError:
+            self._fail_disconnected(batch)
+            raise
+        except Exception as e:
+            results = [e] * len(batch)
+        
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    @staticmethod
+    def _fail_disconnected(batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        """Fail the callers of queued calls that will never be sent"""
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(ConnectionError("MCP client disconnected"))
+    
+    async def _call_tool_direct(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a single tool with its own request, retrying failures"""
         try:
             # Prepare request payload
             payload = {
@@ -229,23 +513,33 @@ class MCPClient:
             
             # Execute tool call with retry logic
             for attempt in range(self.config.max_retries):
+                retry_after = None
                 try:
                     async with self.session.post(
-                        f"{self.config.url}/call",
-                        json=payload
+                        self._call_url,
+                        data=json_dumps(payload),
+                        headers=self.headers,
+                        timeout=self.timeout
                     ) as response:
                         
                         if response.status == 200:
-                            result = await response.json()
-                            logger.info(f"Tool '{tool_name}' executed successfully")
-                            return result
+                            # Success path: no string formatting unless INFO logging is on
+                            if logger.isEnabledFor(logging.INFO):
+                                logger.info("Tool '%s' executed successfully", tool_name)
+                            return await response.json(loads=json_loads)
                         else:
                             error_text = await response.text()
                             logger.error(f"Tool call failed: {response.status} - {error_text}")
                             
+                            if response.status < 500 and response.status not in RETRYABLE_STATUSES:
+                                raise MCPToolCallError(f"Tool call failed: {response.status} - {error_text}")
                             if attempt == self.config.max_retries - 1:
                                 raise RuntimeError(f"Tool call failed after {self.config.max_retries} attempts")
+                            retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
                                 
+                except MCPToolCallError:
+                    raise
+                        
                 except asyncio.TimeoutError:
                     logger.warning(f"Tool call timeout, attempt {attempt + 1}/{self.config.max_retries}")
                     if attempt == self.config.max_retries - 1:
@@ -256,12 +550,162 @@ class MCPClient:
                     if attempt == self.config.max_retries - 1:
                         raise
                         
-                # Wait before retry
-                await asyncio.sleep(2 ** attempt)
+                # Wait before retry, preferring the server's own hint
+                if retry_after is None:
+                    retry_after = min(RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, RETRY_JITTER), RETRY_MAX_DELAY)
+                await asyncio.sleep(retry_after)
                 
         except Exception as e:
             logger.error(f"Failed to call tool '{tool_name}': {str(e)}")
             raise
+    
+    async def call_tool_streaming(self, tool_name: str, parameters: Dict[str, Any]) -> AsyncIterator[Dict[str, str]]:
+        """
+        Call a tool and yield its response body incrementally
+        
+        Meant for large payloads such as read_paper: the body is never buffered
+        whole, and each {"content_chunk": text} item can be processed as it
+        arrives. Streamed calls bypass batching, caching and retries.
+        """
+        # The response is read on the session's loop and handed over chunk by chunk
+        stream = self._call_tool_streaming(tool_name, parameters)
+        try:
+            while True:
+                chunk = await self._on_client_loop(_next_chunk(stream))
+                if chunk is _STREAM_END:
+                    return
+                yield chunk
+        finally:
+            await self._on_client_loop(_close_stream(stream))
+    
+    async def _call_tool_streaming(self, tool_name: str, parameters: Dict[str, Any]) -> AsyncIterator[Dict[str, str]]:
+        if not self.connected:
+            raise RuntimeError("MCP client not connected")
+            
+        if tool_name not in self.tools:
+            raise ValueError(f"Tool '{tool_name}' not available")
+        
+        async with self.session.post(
+            self._call_url,
+            data=json_dumps({"tool": tool_name, "parameters": parameters}),
+            headers=self.headers,
+            timeout=self.timeout
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise RuntimeError(f"Tool call failed: {response.status} - {error_text}")
+            
+            # Incremental decoding keeps multi-byte characters split across chunks intact
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                text = decoder.decode(chunk)
+                if text:
+                    yield {"content_chunk": text}
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield {"content_chunk": text}
+    
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Seconds from a numeric Retry-After header, capped at the request timeout"""
+        if not value:
+            return None
+        try:
+            return min(max(float(value), 0.0), float(self.config.timeout))
+        except ValueError:
+            return None  # HTTP-date form; fall back to exponential backoff
+            
+    async def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Call several tools in one round trip via the server's batch_execute tool
+        
+        Results are returned in the order of calls; a failed sub-call yields an
+        {"error": ...} entry instead of failing the whole batch. Servers without
+        a /batch endpoint get the calls issued concurrently, one request each.
+        """
+        return await self._on_client_loop(self._call_tools_batch(calls))
+    
+    async def _call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        if not self.connected:
+            raise RuntimeError("MCP client not connected")
+        
+        for tool_name, _ in calls:
+            if tool_name not in self.tools:
+                raise ValueError(f"Tool '{tool_name}' not available")
+        
+        results = await self._execute_calls(calls)
+        for (tool_name, parameters), result in zip(calls, results):
+            self._invalidate_after_download(tool_name, parameters, result)
+        return [
+            {"error": str(result)} if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    async def _execute_calls(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Run calls as one batch_execute request when possible, returning a result or exception per call
+        
+        A transient batch failure (5xx, 408/429 or a transport error) falls back to
+        individual calls, which keep the per-call retry and backoff of _call_tool_direct.
+        """
+        if len(calls) == 1:
+            tool_name, parameters = calls[0]
+            try:
+                return [await self._call_tool_direct(tool_name, parameters)]
+            except Exception as e:
+                return [e]
+        
+        if calls and self.batch_supported:
+            payload = {
+                "tool": "batch_execute",
+                "parameters": {
+                    "calls": [
+                        {"tool": tool_name, "parameters": parameters}
+                        for tool_name, parameters in calls
+                    ],
+                    "maxConcurrent": BATCH_MAX_CONCURRENT,
+                    "stopOnError": False
+                }
+            }
+            try:
+                async with self.session.post(
+                    self._batch_url,
+                    data=json_dumps(payload),
+                    headers=self.headers,
+                    timeout=self.timeout
+                ) as response:
+                    if response.status == 200:
+                        return self._demultiplex_batch(await response.json(loads=json_loads), len(calls))
+                    if response.status in (404, 405):
+                        logger.info("MCP server has no batch endpoint, falling back to concurrent calls")
+                        self.batch_supported = False
+                    else:
+                        error_text = await response.text()
+                        if response.status < 500 and response.status not in RETRYABLE_STATUSES:
+                            raise MCPToolCallError(f"Batch tool call failed: {response.status} - {error_text}")
+                        # Transient failure: send the calls individually below, each with its own retries
+                        logger.warning("Batch tool call failed: %s - %s; retrying calls individually",
+                                       response.status, error_text)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("Batch tool call failed: %s; retrying calls individually", e)
+        
+        return list(await asyncio.gather(
+            *(self._call_tool_direct(tool_name, parameters) for tool_name, parameters in calls),
+            return_exceptions=True
+        ))
+    
+    @staticmethod
+    def _demultiplex_batch(batch_result: Dict[str, Any], num_calls: int) -> List[Union[Dict[str, Any], Exception]]:
+        """Map batch_execute sub-results back to the position of their call"""
+        results: List[Union[Dict[str, Any], Exception]] = [RuntimeError("No result returned")] * num_calls
+        for position, item in enumerate(batch_result.get("results", [])):
+            index = item.get("index", position)
+            if not 0 <= index < num_calls:
+                continue
+            if item.get("error") is not None:
+                results[index] = RuntimeError(f"Tool call failed: {item['error']}")
+            else:
+                results[index] = item.get("result", item)
+        return results
             
     def get_available_tools(self) -> List[str]:
         """Get list of available tool names"""
@@ -271,15 +715,34 @@ class MCPClient:
         """Get specification for a specific tool"""
         return self.tools.get(tool_name)
         
-    def get_all_tool_specs(self) -> Dict[str, MCPToolSpec]:
-        """Get all tool specifications"""
-        return self.tools.copy()
+    def get_all_tool_specs(self) -> Mapping[str, MCPToolSpec]:
+        """Get all tool specifications as a read-only view"""
+        return self._tools_view
+
+def _is_error_result(result: Any) -> bool:
+    """Whether a tool result is a failure reported in the payload rather than raised"""
+    if isinstance(result, Exception):
+        return True
+    return isinstance(result, dict) and ("error" in result or result.get("status") == "error")
+
+_STREAM_END = object()
+
+async def _next_chunk(stream: AsyncIterator[Dict[str, str]]) -> Any:
+    """Advance a stream by one item, returning _STREAM_END once it is exhausted"""
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return _STREAM_END
+
+async def _close_stream(stream) -> None:
+    """Close a stream on the loop that reads it"""
+    await stream.aclose()
 
 # Utility functions for integration with the research pipeline
 
 async def create_mcp_client(server_url: str, **kwargs) -> MCPClient:
     """
-    Create and connect MCP client
+    Create and connect MCP client, reusing an already connected client for the same server
     
     Args:
         server_url: URL of the MCP server
@@ -292,11 +755,21 @@ async def create_mcp_client(server_url: str, **kwargs) -> MCPClient:
         url=server_url.rstrip('/'),
         timeout=kwargs.get('timeout', 30),
         max_retries=kwargs.get('max_retries', 3),
-        auth_token=kwargs.get('auth_token')
+        auth_token=kwargs.get('auth_token'),
+        pool_size=kwargs.get('pool_size', POOL_LIMIT_PER_HOST)
     )
     
+    return await _run_on_io_loop(_get_connected_client(config))
+
+async def _get_connected_client(config: MCPServerConfig) -> MCPClient:
+    key = (config.url, config.timeout, config.max_retries, config.auth_token)
+    client = _clients.get(key)
+    if client is not None and client.connected:
+        return client
+    
     client = MCPClient(config)
     await client.connect()
+    _clients[key] = client
     return client
 
 async def search_papers_mcp(client: MCPClient, query: str, max_results: int = 10, **kwargs) -> Dict[str, Any]:
@@ -333,6 +806,21 @@ async def download_paper_mcp(client: MCPClient, paper_id: str) -> Dict[str, Any]
     """
     return await client.call_tool("download_paper", {"paper_id": paper_id})
 
+async def download_papers_mcp_batch(client: MCPClient, paper_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Download several papers in a single batched MCP request
+    
+    Args:
+        client: Connected MCP client
+        paper_ids: ArXiv paper IDs
+        
+    Returns:
+        Download results in the same order as paper_ids
+    """
+    return await client.call_tools_batch(
+        [("download_paper", {"paper_id": paper_id}) for paper_id in paper_ids]
+    )
+
 async def read_paper_mcp(client: MCPClient, paper_id: str) -> Dict[str, Any]:
     """
     Read paper content using MCP client
@@ -344,4 +832,18 @@ async def read_paper_mcp(client: MCPClient, paper_id: str) -> Dict[str, Any]:
     Returns:
         Paper content
     """
-    return await client.call_tool("read_paper", {"paper_id": paper_id})
\ No newline at end of file
+    return await client.call_tool("read_paper", {"paper_id": paper_id})
+
+async def read_paper_mcp_streaming(client: MCPClient, paper_id: str) -> AsyncIterator[Dict[str, str]]:
+    """
+    Stream paper content using MCP client
+    
+    Args:
+        client: Connected MCP client
+        paper_id: ArXiv paper ID
+        
+    Yields:
+        {"content_chunk": text} pieces of the raw response as they arrive
+    """
+    async for chunk in client.call_tool_streaming("read_paper", {"paper_id": paper_id}):
+        yield chunk
@@ -4,46 +4,77 @@ Provides functions to capture research data as memories.
 """
 
 import json
+import atexit
 import asyncio
+import functools
+import pathlib
 import subprocess
 import os
-from typing import Optional, Dict, Any, List
+import threading
+from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass
 import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+MCP_CALL_TIMEOUT = 10.0  # Seconds to wait for a single JSON-RPC response
+MCP_STDOUT_LIMIT = 16 * 1024 * 1024  # Largest single response line (memory listings can be big)
+CAPTURE_DRAIN_TIMEOUT = 10.0  # Seconds to wait for queued background captures on shutdown
+
+# MCP handshake parameters, identical for every server start
+MCP_INITIALIZE_PARAMS = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {"tools": {}},
+    "clientInfo": {"name": "local-deep-researcher", "version": "1.0.0"}
+}
+
+# Start from current file and go up to find memoer-mcp
+_CURRENT_PATH = pathlib.Path(__file__).resolve()
+
+# Look for memoer-mcp in common locations relative to this file
+_MEMOER_MCP_SEARCH_PATHS = (
+    # Same level as local-deep-researcher (../../memoer-mcp)
+    _CURRENT_PATH.parents[4] / "memoer-mcp",
+    # In services directory (../../../memoer-mcp) 
+    _CURRENT_PATH.parents[3] / "memoer-mcp",
+    # In MonkeyResearcher root (../../../../memoer-mcp)
+    _CURRENT_PATH.parents[5] / "memoer-mcp",
+)
+
+@functools.lru_cache(maxsize=1)
 def find_memoer_mcp_path() -> str:
-    """Auto-detect the memoer-mcp server path"""
-    import pathlib
-    
-    # Start from current file and go up to find memoer-mcp
-    current_path = pathlib.Path(__file__).resolve()
-    
-    # Look for memoer-mcp in common locations relative to this file
-    search_paths = [
-        # Same level as local-deep-researcher (../../memoer-mcp)
-        current_path.parents[4] / "memoer-mcp",
-        # In services directory (../../../memoer-mcp) 
-        current_path.parents[3] / "memoer-mcp",
-        # In MonkeyResearcher root (../../../../memoer-mcp)
-        current_path.parents[5] / "memoer-mcp",
-    ]
-    
-    for path in search_paths:
-        if path.exists() and (path / "dist" / "index.js").exists():
-            print(f"[DEBUG] Found memoer-mcp at: {path}")
+    """Auto-detect the memoer-mcp server path (probed once per process)"""
+    for path in _MEMOER_MCP_SEARCH_PATHS:
+        if (path / "dist" / "index.js").exists():
+            logger.debug(f"Found memoer-mcp at: {path}")
             return str(path)
     
     # Fallback to environment variable or default
     env_path = os.environ.get('MEMOER_MCP_PATH')
     if env_path and pathlib.Path(env_path).exists():
-        print(f"[DEBUG] Using MEMOER_MCP_PATH: {env_path}")
+        logger.debug(f"Using MEMOER_MCP_PATH: {env_path}")
         return env_path
         
     # Last resort - return a reasonable default
-    default_path = str(current_path.parents[4] / "memoer-mcp")
-    print(f"[DEBUG] Using default memoer-mcp path: {default_path}")
+    default_path = str(_MEMOER_MCP_SEARCH_PATHS[0])
+    logger.debug(f"Using default memoer-mcp path: {default_path}")
     return default_path
 
 @dataclass
@@ -57,131 +88,239 @@ class MemoryCapture:
     def __post_init__(self):
         if not self.mcp_server_path:
             self.mcp_server_path = find_memoer_mcp_path()
-            print(f"[DEBUG] Auto-detected memoer-mcp path: {self.mcp_server_path}")
 
 class MemoryClient:
     """Client for capturing research memories via MCP protocol"""
     
     def __init__(self, config: MemoryCapture):
         self.config = config
+        # Server environment is fixed by the config, so build it once
+        self._env = {
+            **os.environ,
+            "DATABASE_URL": f"file:{config.mcp_server_path}/prisma/memoer.db"
+        }
+        # One long-lived memoer-mcp process, multiplexed by JSON-RPC id. It lives on a
+        # private event loop thread because graph nodes call in via short-lived asyncio.run() loops
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._stdin_lock: Optional[asyncio.Lock] = None
+        self._reader_tasks: List[asyncio.Task] = []
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 1
+        # Background capture queue, consumed on the I/O loop off the research critical path
+        self._capture_queue: Optional[asyncio.Queue[Dict[str, Any]]] = None
+        self._capture_task: Optional[asyncio.Task] = None
     
-    async def _call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Call MCP tool via subprocess with proper initialization sequence"""
-        
+    def _get_io_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the client's I/O loop thread on first use"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="memoer-mcp-io", daemon=True).start()
+            # Daemon threads still run during atexit, so queued captures get written
+            atexit.register(self._drain_at_exit)
+        return self._loop
+    
+    async def _run_on_io_loop(self, coro):
+        """Run a coroutine on the client's I/O loop and await it from the caller's loop"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._get_io_loop()))
+    
+    def submit_capture(self, **capture_kwargs):
+        """Queue a capture_research_memory call to run in the background"""
         if not self.config.enabled:
-            logger.debug("Memory capture disabled")
-            return {"success": True, "message": "Memory disabled"}
-        
+            return
+        self._get_io_loop().call_soon_threadsafe(self._enqueue_capture, capture_kwargs)
+    
+    def _enqueue_capture(self, capture_kwargs: Dict[str, Any]):
+        if self._capture_queue is None:
+            self._capture_queue = asyncio.Queue()
+            self._capture_task = asyncio.create_task(self._capture_worker())
+        self._capture_queue.put_nowait(capture_kwargs)
+    
+    async def _capture_worker(self):
+        """Write queued memories one at a time over the persistent server"""
+        # memoer-mcp has no batch tool, so captures are sent sequentially
+        while True:
+            capture_kwargs = await self._capture_queue.get()
+            try:
+                await self.capture_research_memory(**capture_kwargs)
+            except Exception as e:
+                logger.warning(f"Background memory capture failed: {str(e)}")
+            finally:
+                self._capture_queue.task_done()
+    
+    async def _drain_captures(self, timeout: float):
+        """Wait for queued captures to finish, giving up after timeout"""
+        if self._capture_queue is None:
+            return
         try:
-            # Prepare MCP initialization sequence followed by tool call
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {"tools": {}},
-                    "clientInfo": {"name": "local-deep-researcher", "version": "1.0.0"}
-                }
-            }
-            
-            initialized_request = {
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "initialized",
-                "params": {}
-            }
-            
-            tool_request = {
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_name,
-                    "arguments": arguments
-                }
-            }
-            
-            print(f"[DEBUG] Sending MCP tool request: {tool_name} with args: {arguments}")
-            
-            # Call MCP server directly with proper environment
-            env = {
-                **os.environ,
-                "DATABASE_URL": f"file:{self.config.mcp_server_path}/prisma/memoer.db"
-            }
+            await asyncio.wait_for(self._capture_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropped {self._capture_queue.qsize()} pending memory captures on shutdown")
+    
+    def _drain_at_exit(self):
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._drain_captures(CAPTURE_DRAIN_TIMEOUT), self._loop
+            ).result(CAPTURE_DRAIN_TIMEOUT + 1)
+        except Exception:
+            pass
+    
+    async def _ensure_started(self):
+        """Start the memoer-mcp server and run the MCP handshake once"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+            self._stdin_lock = asyncio.Lock()
+        
+        async with self._start_lock:
+            if self._proc is not None and self._proc.returncode is None:
+                return
+            self._reset_process_state()
             
-            process = await asyncio.create_subprocess_exec(
+            # Server logs are only worth a pipe (and decoding) when someone will read them
+            capture_stderr = logger.isEnabledFor(logging.DEBUG)
+            self._proc = await asyncio.create_subprocess_exec(
                 'node',
                 'dist/index.js',
                 cwd=self.config.mcp_server_path,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,  # Capture stderr separately
-                env=env
+                stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+                env=self._env,
+                limit=MCP_STDOUT_LIMIT
             )
+            self._reader_tasks = [asyncio.create_task(self._read_responses(self._proc))]
+            if capture_stderr:
+                # Drained continuously so a chatty server never blocks on a full pipe
+                self._reader_tasks.append(asyncio.create_task(self._drain_stderr(self._proc)))
             
-            # Send MCP initialization sequence with line separation
-            requests = [
-                json.dumps(init_request) + '\n',
-                json.dumps(initialized_request) + '\n', 
-                json.dumps(tool_request) + '\n'
-            ]
-            
-            request_data = ''.join(requests).encode('utf-8')
-            
-            # Add timeout to handle potential hanging
+            # MCP initialization sequence, sent once for the life of the process
+            await self._request("initialize", MCP_INITIALIZE_PARAMS)
+            await self._send({
+                "jsonrpc": "2.0",
+                "id": self._allocate_id(),
+                "method": "initialized",
+                "params": {}
+            })
+    
+    def _reset_process_state(self):
+        """Forget the current process, failing any requests still waiting on it"""
+        for task in self._reader_tasks:
+            task.cancel()
+        self._reader_tasks = []
+        if self._proc is not None and self._proc.returncode is None:
+            try:
+                self._proc.kill()
+            except ProcessLookupError:
+                pass
+        self._proc = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("MCP server process restarted"))
+        self._pending.clear()
+    
+    def _allocate_id(self) -> int:
+        request_id = self._next_id
+        self._next_id += 1
+        return request_id
+    
+    async def _send(self, message: Dict[str, Any]):
+        """Write one newline-delimited JSON-RPC message to the server"""
+        async with self._stdin_lock:
+            self._proc.stdin.write(json_dumps(message) + b'\n')
+            await self._proc.stdin.drain()
+    
+    async def _request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a JSON-RPC request and wait for the response with the same id"""
+        request_id = self._allocate_id()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": method,
+                "params": params
+            })
+            return await asyncio.wait_for(future, timeout=MCP_CALL_TIMEOUT)
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def _read_responses(self, proc: asyncio.subprocess.Process):
+        """Resolve pending requests from the server's newline-delimited stdout"""
+        # Each response is handled the moment its line arrives; the server stays warm
+        while True:
+            try:
+                line = await proc.stdout.readline()
+            except ValueError:
+                # A line beyond MCP_STDOUT_LIMIT leaves the stream unparseable; restart on next call
+                logger.warning("MCP response exceeded the stdout line limit, restarting server")
+                proc.kill()
+                break
+            if not line:
+                break
+            line = line.strip()
+            # Notifications and log lines carry no id; skip them without a full parse
+            if not line.startswith(b'{') or b'"id"' not in line:
+                continue
+            try:
+                response = json_loads(line)
+            except ValueError as e:  # json and orjson decode errors are both ValueErrors
+                logger.debug(f"JSON decode error for line: {line!r}, error: {e}")
+                continue
+            # O(1) hand-off to whichever request owns this id; unknown ids are ignored
+            future = self._pending.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        
+        # Server exited; fail whoever is still waiting so they don't hit the timeout
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"MCP server exited with code {proc.returncode}"))
+    
+    async def _drain_stderr(self, proc: asyncio.subprocess.Process):
+        """Consume server logs so a full stderr pipe never stalls the child"""
+        while True:
+            line = await proc.stderr.readline()
+            if not line:
+                break
+            logger.debug(f"MCP stderr: {line[:4096].decode('utf-8', errors='replace').rstrip()}")
+    
+    async def _call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call MCP tool on the persistent memoer-mcp server"""
+        
+        if not self.config.enabled:
+            logger.debug("Memory capture disabled")
+            return {"success": True, "message": "Memory disabled"}
+        
+        try:
+            logger.debug(f"Sending MCP tool request: {tool_name} with args: {arguments}")
+            return await self._run_on_io_loop(self._call_mcp_tool_on_io_loop(tool_name, arguments))
+        except Exception as e:
+            logger.warning(f"MCP call failed: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    async def _call_mcp_tool_on_io_loop(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a tools/call request over the server's stdio channel"""
+        try:
+            await self._ensure_started()
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(input=request_data), 
-                    timeout=10.0  # 10 second timeout
-                )
+                tool_response = await self._request("tools/call", {
+                    "name": tool_name,
+                    "arguments": arguments
+                })
             except asyncio.TimeoutError:
-                process.kill()
+                # A hung server is restarted on the next call
+                self._reset_process_state()
                 return {"success": False, "error": "MCP server timeout"}
             
-            if process.returncode == 0:
-                try:
-                    stdout_text = stdout.decode('utf-8').strip()
-                    stderr_text = stderr.decode('utf-8').strip() if stderr else ""
-                    
-                    print(f"[DEBUG] MCP stdout: {stdout_text}")
-                    if stderr_text:
-                        print(f"[DEBUG] MCP stderr: {stderr_text}")
-                    
-                    # Parse each JSON response line from stdout only
-                    response_lines = stdout_text.split('\n')
-                    tool_response = None
-                    
-                    for line in response_lines:
-                        line = line.strip()
-                        if line and line.startswith('{'): # Valid JSON line
-                            try:
-                                response = json.loads(line)
-                                print(f"[DEBUG] Parsed response: {response}")
-                                # Look for our tool call response (id=3)
-                                if response.get("id") == 3:
-                                    tool_response = response
-                                    break
-                            except json.JSONDecodeError as e:
-                                print(f"[DEBUG] JSON decode error for line: {line}, error: {e}")
-                                continue
-                    
-                    if tool_response:
-                        if "result" in tool_response:
-                            return {"success": True, "response": tool_response}
-                        elif "error" in tool_response:
-                            return {"success": False, "error": tool_response["error"].get("message", "Tool call failed")}
-                    
-                    logger.warning(f"No tool response (id=3) found in output: {stdout_text}")
-                    return {"success": False, "error": "No tool response found"}
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing MCP response: {str(e)}")
-                    return {"success": False, "error": f"Parse error: {str(e)}"}
-            else:
-                error_msg = stderr.decode('utf-8') if stderr else "Unknown error"
-                logger.warning(f"MCP server returned non-zero exit code: {process.returncode}, error: {error_msg}")
-                return {"success": False, "error": f"Server error (exit code: {process.returncode})"}
+            if "result" in tool_response:
+                return {"success": True, "response": tool_response}
+            elif "error" in tool_response:
+                return {"success": False, "error": tool_response["error"].get("message", "Tool call failed")}
+            
+            logger.warning(f"Unexpected MCP tool response: {tool_response}")
+            return {"success": False, "error": "No tool response found"}
                     
         except Exception as e:
             logger.warning(f"MCP call failed: {str(e)}")
@@ -233,7 +372,7 @@ class MemoryClient:
         if research_loop_count is not None:
             arguments["researchLoopCount"] = research_loop_count
         if metadata:
-            arguments["metadata"] = json.dumps(metadata)
+            arguments["metadata"] = json_dumps(metadata).decode('utf-8')
         
         # Call MCP tool
         result = await self._call_mcp_tool("createResearchMemory", arguments)
@@ -276,17 +415,30 @@ class MemoryClient:
                 response = result["response"]
                 if "result" in response and "content" in response["result"]:
                     content_text = response["result"]["content"][0].get("text", "[]")
-                    memories = json.loads(content_text)
+                    memories = json_loads(content_text)
                     logger.info(f"Retrieved {len(memories)} similar research memories")
                     return memories
-            except (json.JSONDecodeError, KeyError, IndexError) as e:
+            except (ValueError, KeyError, IndexError) as e:
                 logger.warning(f"Failed to parse memory retrieval response: {str(e)}")
         
         return []
     
     async def close(self):
-        """Cleanup resources (no persistent connections in MCP)"""
-        pass
+        """Flush background captures and stop the memoer-mcp server process"""
+        if self._loop is not None:
+            await self._run_on_io_loop(self._drain_captures(CAPTURE_DRAIN_TIMEOUT))
+            await self._run_on_io_loop(self._stop_process())
+    
+    async def _stop_process(self):
+        """Let the server exit on stdin EOF, killing it if it lingers"""
+        proc = self._proc
+        if proc is not None and proc.returncode is None:
+            proc.stdin.close()
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=2.0)
+            except asyncio.TimeoutError:
+                pass
+        self._reset_process_state()
 
 # Global memory client instance
 _memory_client: Optional[MemoryClient] = None
@@ -318,6 +470,9 @@ async def capture_memory_safe(
     """
     Safely capture memory with error handling
     
+    The capture is queued and written in the background, so the research
+    pipeline never waits on the memory server; failures are only logged.
+    
     Args:
         content: Content to store
         research_topic: Research topic
@@ -325,12 +480,12 @@ async def capture_memory_safe(
         **kwargs: Additional arguments
         
     Returns:
-        bool: True if successful or memory disabled, False on error
+        bool: True once queued (or memory disabled); never fails the pipeline
     """
     try:
         client = get_memory_client()
         if client:
-            return await client.capture_research_memory(
+            client.submit_capture(
                 content=content,
                 research_topic=research_topic,
                 memory_type=memory_type,
@@ -338,7 +493,7 @@ async def capture_memory_safe(
             )
         else:
             logger.debug("Memory client not initialized")
-            return True  # Return True when disabled to avoid pipeline failures
+        return True  # Return True when disabled to avoid pipeline failures
             
     except Exception as e:
         logger.warning(f"Memory capture failed safely: {str(e)}")
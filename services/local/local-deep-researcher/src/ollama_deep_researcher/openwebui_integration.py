@@ -6,18 +6,168 @@ enabling seamless integration with OpenWebUI tool servers including the ArXiv MC
 """
 
 import json
+import hashlib
 import asyncio
 import aiohttp
+import httpx
 import logging
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Any, Callable, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import time
 import re
+import sys
+from types import MappingProxyType
+
+try:
+    import aiodns
+except ImportError:  # Installed with aiohttp[speedups]; fall back to the threaded resolver
+    aiodns = None
+
+try:
+    from aiohttp_retry import ExponentialRetry, RetryClient
+except ImportError:  # Optional: without it tool calls are attempted once
+    ExponentialRetry = RetryClient = None
+
+try:
+    import h2
+except ImportError:  # Installed with httpx[http2]; without it the httpx backend speaks HTTP/1.1
+    h2 = None
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str, using orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+_HTTP_METHODS = frozenset({"get", "post", "put", "delete", "patch"})
+_BODY_METHODS = frozenset({"post", "put", "patch"})  # Methods that send params as a JSON body
+
+# Only safe, idempotent requests are retried, and only on gateway/overload statuses;
+# re-sending a tool execution POST after a 500 could run it twice
+_RETRY_METHODS = frozenset({"get", "head", "options"})
+_RETRY_STATUSES = frozenset({502, 503, 504})
+
+# Transport failures reaching a tool server, from either HTTP backend
+# (aiohttp.ServerDisconnectedError is a ClientConnectionError)
+CONNECTION_ERRORS = (aiohttp.ClientConnectionError, httpx.TransportError)
+
+# "{name}" placeholders in OpenAPI path templates
+_PATH_PARAM_RE = re.compile(r"\{(\w+)\}")
+
+# One pooled HTTP session shared by every registered tool server, so tool calls
+# reuse keep-alive connections instead of paying a new handshake per request
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_retry_client: Optional["RetryClient"] = None  # Wraps _shared_session when aiohttp-retry is installed
+
+# Connection pool sizing for the shared session
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 32  # Headroom for concurrent ArXiv searches fanned out by research loops
+KEEPALIVE_TIMEOUT = 300
+DNS_CACHE_TTL = 300
+
+def _get_session() -> aiohttp.ClientSession:
+    """
+    Get the shared aiohttp session, creating it on first use
+    
+    Sessions are bound to an event loop; callers that drive the pipeline with
+    asyncio.run() get a fresh session per loop and must close it with
+    cleanup_integration() before that loop ends.
+    """
+    global _shared_session, _shared_session_loop, _shared_retry_client
+    loop = asyncio.get_running_loop()
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                # c-ares resolves names on the loop instead of a getaddrinfo thread hop
+                resolver=aiohttp.AsyncResolver() if aiodns is not None else None,
+                limit=POOL_LIMIT,
+                limit_per_host=POOL_LIMIT_PER_HOST,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                enable_cleanup_closed=True,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                use_dns_cache=True
+            )
+        )
+        _shared_session_loop = loop
+        _shared_retry_client = (
+            RetryClient(client_session=_shared_session) if RetryClient is not None else None
+        )
+    return _shared_session
+
+def _get_retry_client() -> Optional["RetryClient"]:
+    """Get the retrying wrapper around the shared session, or None without aiohttp-retry"""
+    _get_session()
+    return _shared_retry_client
+
+async def _close_session():
+    """Close the shared session if it is still open"""
+    global _shared_session, _shared_session_loop, _shared_retry_client
+    session = _shared_session
+    if session is None:
+        return
+    _shared_session = None
+    _shared_session_loop = None
+    _shared_retry_client = None
+    if not session.closed:
+        await session.close()
+
+# Optional httpx backend: one client multiplexes concurrent tool calls to a host over
+# a single HTTP/2 connection, where aiohttp would open one HTTP/1.1 connection per call
+_shared_httpx_client: Optional[httpx.AsyncClient] = None
+_shared_httpx_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+HTTPX_MAX_KEEPALIVE = 20
+
+def _get_httpx_client() -> httpx.AsyncClient:
+    """Get the shared httpx client for the running event loop, creating it on first use
+    
+    Like the aiohttp session, it must be closed with cleanup_integration() before the loop ends.
+    """
+    global _shared_httpx_client, _shared_httpx_client_loop
+    loop = asyncio.get_running_loop()
+    if (_shared_httpx_client is None or _shared_httpx_client.is_closed
+            or _shared_httpx_client_loop is not loop):
+        _shared_httpx_client = httpx.AsyncClient(
+            http2=h2 is not None,
+            limits=httpx.Limits(
+                max_connections=POOL_LIMIT,
+                max_keepalive_connections=HTTPX_MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_TIMEOUT
+            )
+        )
+        _shared_httpx_client_loop = loop
+    return _shared_httpx_client
+
+async def _close_httpx_client():
+    """Close the shared httpx client if it is still open"""
+    global _shared_httpx_client, _shared_httpx_client_loop
+    client = _shared_httpx_client
+    if client is None:
+        return
+    _shared_httpx_client = None
+    _shared_httpx_client_loop = None
+    if not client.is_closed:
+        await client.aclose()
+
+# slots=True needs Python 3.10+; older interpreters keep regular dataclasses
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class ToolServerConfig:
     """Tool Server Configuration based on OpenWebUI patterns"""
     url: str
@@ -26,10 +176,20 @@ class ToolServerConfig:
     auth_token: Optional[str] = None
     timeout: int = 30
     max_retries: int = 3
+    http_backend: str = "aiohttp"  # "aiohttp" or "httpx" (HTTP/2 when h2 is installed)
     enabled: bool = True
     access_control: Optional[Dict[str, Any]] = None
 
-@dataclass
+class OperationInfo(NamedTuple):
+    """OpenAPI operation resolved once at registration time"""
+    path: str
+    method: str  # Lowercase; also the name of the ClientSession request method
+    operation: Dict[str, Any]
+    path_param_names: FrozenSet[str]  # Placeholders in the path template
+    method_upper: str
+    sends_body: bool  # Parameters go in a JSON body rather than the query string
+
+@dataclass(**_DATACLASS_SLOTS)
 class ToolServerData:
     """Tool Server Data structure matching OpenWebUI format"""
     idx: int
@@ -37,9 +197,15 @@ class ToolServerData:
     url: str
     openapi: Dict[str, Any]
     auth: Dict[str, Any]
+    base_url: str = ""  # Prefix for operation paths, resolved at registration
     config: Dict[str, Any] = field(default_factory=dict)
+    request_headers: Mapping[str, str] = field(default_factory=dict)  # Read-only, built once at registration
+    retry_options: Optional[Any] = None  # aiohttp-retry ExponentialRetry, when installed
+    spec_hash: Optional[str] = None  # SHA-256 of the raw OpenAPI document
+    op_index: Dict[str, OperationInfo] = field(default_factory=dict)  # operationId -> operation
+    tool_specs: List["ToolSpec"] = field(default_factory=list)
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ToolSpec:
     """Tool Specification in OpenAI function format"""
     type: str = "function"
@@ -54,13 +220,41 @@ class OpenWebUIToolIntegration:
     - OpenAPI specification processing
     - Dynamic function creation and execution
     - Authentication and session management
+    
+    Callers own teardown: use ``async with`` or ``await integration.cleanup()``.
     """
     
     def __init__(self):
         self.tool_servers: Dict[str, ToolServerData] = {}
         self.tool_functions: Dict[str, Callable] = {}
         self.tool_specs: Dict[str, ToolSpec] = {}
-        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._llm_specs_cache: Optional[List[Dict[str, Any]]] = None  # Rebuilt after tools change
+        # Serializes server index assignment for concurrent registrations;
+        # created per event loop because callers use asyncio.run()
+        self._registration_lock: Optional[asyncio.Lock] = None
+        self._registration_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _get_registration_lock(self) -> asyncio.Lock:
+        """Get the registration lock for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._registration_lock is None or self._registration_lock_loop is not loop:
+            self._registration_lock = asyncio.Lock()
+            self._registration_lock_loop = loop
+        return self._registration_lock
+        
+    async def register_tool_servers(self, server_configs: List[ToolServerConfig]) -> List[bool]:
+        """
+        Register several tool servers concurrently
+        
+        Args:
+            server_configs: Tool server configurations
+            
+        Returns:
+            Registration result for each configuration, in order
+        """
+        return list(await asyncio.gather(
+            *(self.register_tool_server(config) for config in server_configs)
+        ))
         
     async def register_tool_server(self, server_config: ToolServerConfig) -> bool:
         """
@@ -77,12 +271,37 @@ class OpenWebUIToolIntegration:
             server_data = await self._get_tool_server_data(server_config)
             
             if server_data:
-                server_idx = len(self.tool_servers)
-                server_data.idx = server_idx
-                self.tool_servers[f"server:{server_idx}"] = server_data
+                async with self._get_registration_lock():
+                    existing_key = next(
+                        (key for key, data in self.tool_servers.items() if data.name == server_data.name),
+                        None
+                    )
+                    if existing_key is not None:
+                        existing = self.tool_servers[existing_key]
+                        if existing.spec_hash == server_data.spec_hash:
+                            # Unchanged spec: keep the already-built functions and specs, but pick up
+                            # new connection settings in place since the tool functions hold `existing`
+                            existing.url = server_data.url
+                            existing.base_url = server_data.base_url
+                            existing.auth = server_data.auth
+                            existing.config = server_data.config
+                            existing.request_headers = server_data.request_headers
+                            existing.retry_options = server_data.retry_options
+                            logger.info(f"Tool server already registered with unchanged spec: {server_config.name}")
+                            return True
+                        # Spec changed: rebuild this server's tools in place
+                        server_idx = existing.idx
+                        prefix = f"{existing_key}_"
+                        for key in [k for k in self.tool_functions if k.startswith(prefix)]:
+                            del self.tool_functions[key]
+                            self.tool_specs.pop(key, None)
+                    else:
+                        server_idx = len(self.tool_servers)
+                    server_data.idx = server_idx
+                    self.tool_servers[f"server:{server_idx}"] = server_data
                 
-                # Create dynamic functions for each tool
-                await self._create_tool_functions(server_data)
+                    # Create dynamic functions for each tool
+                    await self._create_tool_functions(server_data)
                 
                 logger.info(f"Successfully registered tool server: {server_config.name}")
                 return True
@@ -100,7 +319,6 @@ class OpenWebUIToolIntegration:
         Based on OpenWebUI's get_tool_server_data function
         """
         try:
-            # Create session for this server
             timeout = aiohttp.ClientTimeout(total=config.timeout)
             headers = {
                 'Content-Type': 'application/json',
@@ -113,27 +331,28 @@ class OpenWebUIToolIntegration:
             elif config.auth_type == "session" and config.auth_token:
                 headers['X-Session-Token'] = config.auth_token
             
-            session = aiohttp.ClientSession(timeout=timeout, headers=headers)
+            session = _get_session()
             
-            # Try to get OpenAPI spec
-            # For ArXiv MCP server, use the specific server path
+            # For ArXiv MCP server, tools live under the specific server path
             if "arxiv" in config.name.lower():
-                openapi_url = f"{config.url.rstrip('/')}/arxiv-mcp-server/openapi.json"
+                base_url = f"{config.url.rstrip('/')}/arxiv-mcp-server"
             else:
-                openapi_url = f"{config.url.rstrip('/')}/openapi.json"
+                base_url = config.url.rstrip('/')
+            
+            # Try to get OpenAPI spec
+            openapi_url = f"{base_url}/openapi.json"
             
-            async with session.get(openapi_url) as response:
+            async with session.get(openapi_url, headers=headers, timeout=timeout) as response:
                 if response.status == 200:
-                    openapi_spec = await response.json()
-                    
-                    # Store session for later use
-                    self.sessions[config.name] = session
+                    body = await response.read()
+                    openapi_spec = json_loads(body)
                     
                     return ToolServerData(
                         idx=0,  # Will be set by caller
                         name=config.name,
                         url=config.url,
                         openapi=openapi_spec,
+                        base_url=base_url,
                         auth={
                             "type": config.auth_type,
                             "token": config.auth_token
@@ -141,18 +360,28 @@ class OpenWebUIToolIntegration:
                         config={
                             "timeout": config.timeout,
                             "max_retries": config.max_retries,
+                            "http_backend": config.http_backend,
                             "access_control": config.access_control
-                        }
+                        },
+                        request_headers=MappingProxyType(headers),
+                        retry_options=(
+                            ExponentialRetry(
+                                attempts=config.max_retries,
+                                statuses=set(_RETRY_STATUSES),
+                                retry_all_server_errors=False,
+                                methods={method.upper() for method in _RETRY_METHODS},
+                                exceptions={aiohttp.ClientConnectionError}
+                            )
+                            if ExponentialRetry is not None and config.max_retries > 1 else None
+                        ),
+                        spec_hash=hashlib.sha256(body).hexdigest()
                     )
                 else:
                     logger.error(f"Failed to fetch OpenAPI spec from {openapi_url}: {response.status}")
-                    await session.close()
                     return None
                     
         except Exception as e:
             logger.error(f"Error getting tool server data: {str(e)}")
-            if 'session' in locals():
-                await session.close()
             return None
     
     async def _create_tool_functions(self, server_data: ToolServerData):
@@ -165,6 +394,25 @@ class OpenWebUIToolIntegration:
             
             # Convert OpenAPI spec to tool specifications
             tool_specs = self._convert_openapi_to_tool_payload(openapi_spec)
+            server_data.tool_specs = tool_specs
+            
+            # Index operations once so tool calls skip scanning the spec
+            op_index = {}
+            for path, path_spec in openapi_spec.get("paths", {}).items():
+                for method, operation in path_spec.items():
+                    method_lower = method.lower()
+                    if method_lower not in _HTTP_METHODS:
+                        continue
+                    operation_id = operation.get("operationId", f"{method}_{path.replace('/', '_')}")
+                    op_index[operation_id] = OperationInfo(
+                        path,
+                        method_lower,
+                        operation,
+                        frozenset(_PATH_PARAM_RE.findall(path)),
+                        method.upper(),
+                        method_lower in _BODY_METHODS
+                    )
+            server_data.op_index = op_index
             
             # Create functions for each tool
             for spec in tool_specs:
@@ -186,6 +434,8 @@ class OpenWebUIToolIntegration:
                 
         except Exception as e:
             logger.error(f"Failed to create tool functions: {str(e)}")
+        finally:
+            self._llm_specs_cache = None
     
     def _convert_openapi_to_tool_payload(self, openapi_spec: Dict[str, Any]) -> List[ToolSpec]:
         """
@@ -196,65 +446,67 @@ class OpenWebUIToolIntegration:
         
         try:
             paths = openapi_spec.get("paths", {})
+            schemas = openapi_spec.get("components", {}).get("schemas", {})
+            resolved_refs: Dict[str, Optional[Dict[str, Any]]] = {}  # $ref -> referenced schema
             
             for path, path_spec in paths.items():
                 for method, operation in path_spec.items():
-                    if method.lower() not in ["get", "post", "put", "delete", "patch"]:
+                    method_lower = method.lower()
+                    if method_lower not in _HTTP_METHODS:
                         continue
+                    op_get = operation.get
                     
                     # Extract operation details
-                    operation_id = operation.get("operationId", f"{method}_{path.replace('/', '_')}")
-                    description = operation.get("description", operation.get("summary", ""))
+                    operation_id = op_get("operationId", f"{method}_{path.replace('/', '_')}")
+                    description = op_get("description", op_get("summary", ""))
                     
                     # Build parameters schema
+                    properties: Dict[str, Any] = {}
+                    required: List[str] = []
                     parameters = {
                         "type": "object",
-                        "properties": {},
-                        "required": []
+                        "properties": properties,
+                        "required": required
                     }
                     
                     # Add path parameters
-                    if "parameters" in operation:
-                        for param in operation["parameters"]:
-                            param_name = param.get("name")
-                            param_schema = param.get("schema", {})
-                            param_required = param.get("required", False)
-                            
-                            parameters["properties"][param_name] = {
-                                "type": param_schema.get("type", "string"),
-                                "description": param.get("description", "")
-                            }
-                            
-                            if param_required:
-                                parameters["required"].append(param_name)
+                    for param in op_get("parameters", ()):
+                        param_get = param.get
+                        param_name = param_get("name")
+                        
+                        properties[param_name] = {
+                            "type": param_get("schema", {}).get("type", "string"),
+                            "description": param_get("description", "")
+                        }
+                        
+                        if param_get("required", False):
+                            required.append(param_name)
                     
                     # Add request body parameters for POST/PUT
-                    if method.lower() in ["post", "put", "patch"]:
-                        request_body = operation.get("requestBody", {})
-                        content = request_body.get("content", {})
+                    if method_lower in _BODY_METHODS:
+                        content = op_get("requestBody", {}).get("content", {})
                         
                         if "application/json" in content:
                             schema = content["application/json"].get("schema", {})
                             
                             # Handle direct schema properties
                             if "properties" in schema:
-                                parameters["properties"].update(schema["properties"])
-                                parameters["required"].extend(schema.get("required", []))
+                                properties.update(schema["properties"])
+                                required.extend(schema.get("required", []))
                             
                             # Handle schema references ($ref)
                             elif "$ref" in schema:
                                 ref_path = schema["$ref"]
                                 # Extract schema from components (e.g., #/components/schemas/search_papers_form_model)
                                 if ref_path.startswith("#/components/schemas/"):
-                                    schema_name = ref_path.split("/")[-1]
-                                    components = openapi_spec.get("components", {})
-                                    schemas = components.get("schemas", {})
+                                    if ref_path not in resolved_refs:
+                                        resolved_refs[ref_path] = schemas.get(ref_path.split("/")[-1])
+                                    ref_schema = resolved_refs[ref_path]
                                     
-                                    if schema_name in schemas:
-                                        ref_schema = schemas[schema_name]
+                                    if ref_schema is not None:
                                         if "properties" in ref_schema:
-                                            parameters["properties"].update(ref_schema["properties"])
-                                            parameters["required"].extend(ref_schema.get("required", []))
+                                            properties.update(ref_schema["properties"])
+                                            required.extend(ref_schema.get("required", []))
                     
                     # Create tool specification
                     tool_spec = ToolSpec(
@@ -291,191 +543,110 @@ class OpenWebUIToolIntegration:
         Based on OpenWebUI's execute_tool_server function
         """
         try:
-            # Check if event loop is available and not closed
-            try:
-                loop = asyncio.get_running_loop()
-                if loop.is_closed():
-                    raise RuntimeError("Event loop is closed")
-            except RuntimeError as e:
-                if "no running event loop" in str(e).lower() or "event loop is closed" in str(e).lower():
-                    logger.warning(f"Skipping tool execution - event loop not available: {str(e)}")
-                    raise RuntimeError("Event loop is closed or not available")
-                # Re-raise other RuntimeErrors
-                raise
-            
             # Find the operation in OpenAPI spec
-            operation_info = self._find_operation_by_id(server_data.openapi, function_name)
+            operation_info = self._find_operation_by_id(server_data, function_name)
             
             if not operation_info:
                 raise ValueError(f"Operation {function_name} not found in OpenAPI spec")
             
-            path, method, operation = operation_info
-            
-            # Build request URL
-            # For ArXiv MCP server, prepend the server path
-            if "arxiv" in server_data.name.lower():
-                url = f"{server_data.url.rstrip('/')}/arxiv-mcp-server{path}"
-            else:
-                url = f"{server_data.url.rstrip('/')}{path}"
-            
-            # Replace path parameters
-            path_params = {}
-            for param_name, param_value in parameters.items():
-                if f"{{{param_name}}}" in path:
-                    url = url.replace(f"{{{param_name}}}", str(param_value))
-                    path_params[param_name] = param_value
-            
-            # Remove path parameters from body parameters
-            body_params = {k: v for k, v in parameters.items() if k not in path_params}
+            path = operation_info.path
+            path_param_names = operation_info.path_param_names
             
-            # Debug: Print request data
-            # print(f"===========================================================")
-            # print(f"🔍 OpenWebUI Request Debug:")
-            # print(f"  Function: {function_name}")
-            # print(f"  URL: {url}")
-            # print(f"  Method: {method.upper()}")
-            # print(f"  Path params: {path_params}")
-            # print(f"  Body params: {body_params}")
-            # print(f"===========================================================")
+            base_url = server_data.base_url
             
-            # Prepare request
-            headers = {
-                'Content-Type': 'application/json',
-                'User-Agent': 'DeepResearcher-OpenWebUI/1.0'
-            }
+            if path_param_names:
+                # Split path and body parameters in one pass, then fill the path template
+                path_values = {}
+                body_params = {}
+                for k, v in parameters.items():
+                    if k in path_param_names:
+                        path_values[k] = v
+                    else:
+                        body_params[k] = v
+                try:
+                    url = base_url + path.format_map(path_values)
+                except KeyError as e:
+                    raise ValueError(f"Missing path parameter {e} for {function_name}") from None
+            else:
+                # parameters is the tool function's own kwargs dict, so it can be sent as-is
+                url = base_url + path
+                body_params = parameters
             
-            if token:
-                if server_data.auth.get("type") == "bearer":
-                    headers['Authorization'] = f'Bearer {token}'
-                elif server_data.auth.get("type") == "session":
-                    headers['X-Session-Token'] = token
+            data = json_dumps(body_params) if operation_info.sends_body and body_params else None
+            params = body_params if operation_info.method == "get" else None
             
-            # Always create a fresh session for ArXiv to avoid event loop issues
-            session = self.sessions.get(server_data.name)
-            session_needs_recreation = True
+            # Execute request
+            logger.debug("Tool server request: %s %s params=%s", operation_info.method_upper, url, body_params)
             
-            if session_needs_recreation:
-                # Close old session if it exists
-                if session and not session.closed:
-                    try:
-                        await session.close()
-                    except Exception as e:
-                        logger.warning(f"Error closing old session: {str(e)}")
+            if server_data.config.get("http_backend") == "httpx":
+                response = await _get_httpx_client().request(
+                    operation_info.method_upper,
+                    url,
+                    headers=server_data.request_headers,
+                    timeout=server_data.config.get("timeout", 30),
+                    content=data,
+                    params=params
+                )
+                logger.debug("Response Status: %s", response.status_code)
                 
-                # Recreate session
-                timeout = aiohttp.ClientTimeout(total=server_data.config.get("timeout", 30))
-                headers = {
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'DeepResearcher-OpenWebUI/1.0'
-                }
+                if response.status_code >= 400:
+                    raise RuntimeError(f"Tool server request failed: {response.status_code} - {response.text}")
                 
-                if token:
-                    if server_data.auth.get("type") == "bearer":
-                        headers['Authorization'] = f'Bearer {token}'
-                    elif server_data.auth.get("type") == "session":
-                        headers['X-Session-Token'] = token
-                        
-                session = aiohttp.ClientSession(timeout=timeout, headers=headers)
-                self.sessions[server_data.name] = session
+                result = json_loads(response.content)
+                logger.debug("Response data: %s", result)
+                return result
             
-            # Execute request
-            print(f"  Headers: {headers}")
-            if method.lower() in ["post", "put", "patch"] and body_params:
-                print(f"  JSON payload: {body_params}")
-            elif method.lower() == "get":
-                print(f"  Query params: {body_params}")
-            
-            # Final check before making request - ensure event loop is still running
-            try:
-                loop = asyncio.get_running_loop()
-                if loop.is_closed():
-                    raise RuntimeError("Event loop closed before request")
-            except RuntimeError as e:
-                logger.warning(f"Event loop check failed before request: {str(e)}")
-                raise RuntimeError("Event loop is closed")
+            timeout = aiohttp.ClientTimeout(total=server_data.config.get("timeout", 30))
+            request_kwargs = {}
+            if server_data.retry_options is not None and operation_info.method in _RETRY_METHODS:
+                # aiohttp-retry re-sends 502/503/504 and connection failures with exponential backoff
+                session = _get_retry_client()
+                request_kwargs["retry_options"] = server_data.retry_options
+            else:
+                session = _get_session()
             
-            try:
-                async with session.request(
-                    method=method.upper(),
-                    url=url,
-                    headers=headers,
-                    json=body_params if method.lower() in ["post", "put", "patch"] and body_params else None,
-                    params=body_params if method.lower() == "get" else None
-                ) as response:
-                    
-                    print(f"📡 Response Status: {response.status}")
-                    
-                    if response.status >= 400:
-                        error_text = await response.text()
-                        print(f"❌ Error response: {error_text}")
-                        raise RuntimeError(f"Tool server request failed: {response.status} - {error_text}")
-                    
-                    result = await response.json()
-                    print(f"✅ Response data: {result}")
-                    
-                    # Close session immediately after successful request
-                    try:
-                        await session.close()
-                        # Remove from sessions dict since we closed it
-                        if server_data.name in self.sessions:
-                            del self.sessions[server_data.name]
-                    except Exception as e:
-                        logger.warning(f"Error closing session after request: {str(e)}")
-                    
-                    return result
-                    
-            except RuntimeError as e:
-                # Check if it's an event loop issue
-                if "event loop" in str(e).lower() or "cannot write request body" in str(e).lower():
-                    logger.warning(f"Event loop or connection issue during HTTP request: {str(e)}")
-                    raise RuntimeError("Event loop is closed during request")
-                else:
-                    # Re-raise other RuntimeErrors
-                    raise
-            except Exception as e:
-                # Catch any other async/connection errors that might indicate event loop issues
-                error_msg = str(e).lower()
-                if any(keyword in error_msg for keyword in ["event loop", "cannot write", "connection", "closed", "asyncio"]):
-                    logger.warning(f"Connection/async error (likely event loop issue): {str(e)}")
-                    raise RuntimeError("Event loop or connection issue during request")
-                else:
-                    # Re-raise unexpected errors
-                    logger.error(f"Unexpected error during HTTP request: {str(e)}")
-                    raise
+            # Bound per-method call (session.get / session.post / ...) skips method normalization
+            async with getattr(session, operation_info.method)(
+                url,
+                headers=server_data.request_headers,
+                timeout=timeout,
+                data=data,
+                params=params,
+                **request_kwargs
+            ) as response:
+                
+                logger.debug("Response Status: %s", response.status)
+                
+                if response.status >= 400:
+                    error_text = await response.text()
+                    raise RuntimeError(f"Tool server request failed: {response.status} - {error_text}")
                 
+                result = await response.json(loads=json_loads)
+                logger.debug("Response data: %s", result)
+                return result
+                
+        except CONNECTION_ERRORS as e:
+            logger.warning(f"Connection error calling tool server function {function_name}: {str(e)}")
+            raise
         except Exception as e:
             logger.error(f"Failed to execute tool server function {function_name}: {str(e)}")
-            
-            # Clean up session on any error
-            try:
-                session = self.sessions.get(server_data.name)
-                if session and not session.closed:
-                    await session.close()
-                if server_data.name in self.sessions:
-                    del self.sessions[server_data.name]
-            except Exception as cleanup_error:
-                logger.warning(f"Error during session cleanup: {str(cleanup_error)}")
-            
             raise
     
-    def _find_operation_by_id(self, openapi_spec: Dict[str, Any], operation_id: str) -> Optional[tuple]:
-        """Find operation in OpenAPI spec by operation ID"""
-        paths = openapi_spec.get("paths", {})
-        
-        for path, path_spec in paths.items():
-            for method, operation in path_spec.items():
-                if operation.get("operationId") == operation_id:
-                    return path, method, operation
-        
-        return None
+    def _find_operation_by_id(self, server_data: ToolServerData, operation_id: str) -> Optional[OperationInfo]:
+        """Find operation in the server's OpenAPI spec by operation ID"""
+        return server_data.op_index.get(operation_id)
     
     def get_available_tools(self) -> List[str]:
         """Get list of available tool names"""
         return list(self.tool_functions.keys())
     
     def get_tool_specs_for_llm(self) -> List[Dict[str, Any]]:
-        """Get tool specifications formatted for LLM"""
-        return [spec.__dict__ for spec in self.tool_specs.values()]
+        """Get tool specifications formatted for LLM (cached; do not mutate)"""
+        if self._llm_specs_cache is None:
+            self._llm_specs_cache = [
+                {"type": spec.type, "function": spec.function} for spec in self.tool_specs.values()
+            ]
+        return self._llm_specs_cache
     
     async def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Any:
         """Execute a tool by name"""
@@ -495,28 +666,16 @@ class OpenWebUIToolIntegration:
         return await tool_function(**parameters)
     
     async def cleanup(self):
-        """Clean up sessions and connections"""
-        for session in self.sessions.values():
-            if session and not session.closed:
-                await session.close()
-        self.sessions.clear()
+        """Close the shared HTTP clients; safe to call more than once"""
+        self._llm_specs_cache = None
+        await _close_session()
+        await _close_httpx_client()
         
-    def __del__(self):
-        """Cleanup when object is garbage collected"""
-        # Note: This is a backup cleanup, proper cleanup should be done explicitly
-        if hasattr(self, 'sessions') and self.sessions:
-            import asyncio
-            import warnings
-            try:
-                loop = asyncio.get_running_loop()
-                for session in self.sessions.values():
-                    if session and not session.closed:
-                        loop.create_task(session.close())
-            except RuntimeError:
-                # No event loop running
-                pass
-            except Exception as e:
-                warnings.warn(f"Failed to cleanup sessions: {e}")
+    async def __aenter__(self) -> "OpenWebUIToolIntegration":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.cleanup()
 
 # Global integration instance
 openwebui_integration = OpenWebUIToolIntegration()
@@ -524,13 +683,15 @@ openwebui_integration = OpenWebUIToolIntegration()
 # Utility functions for easy integration
 
 async def register_arxiv_mcp_server(server_url: str = "http://localhost:9937", 
-                                   auth_token: Optional[str] = None) -> bool:
+                                   auth_token: Optional[str] = None,
+                                   http_backend: str = "aiohttp") -> bool:
     """
     Register ArXiv MCP server using OpenWebUI patterns
     
     Args:
         server_url: URL of the ArXiv MCP server
         auth_token: Optional authentication token
+        http_backend: "aiohttp" or "httpx" for tool calls
         
     Returns:
         True if registration successful
@@ -541,7 +702,8 @@ async def register_arxiv_mcp_server(server_url: str = "http://localhost:9937",
         auth_type="bearer",
         auth_token=auth_token,
         timeout=30,
-        max_retries=3
+        max_retries=3,
+        http_backend=http_backend
     )
     
     return await openwebui_integration.register_tool_server(config)
@@ -0,0 +1,59 @@
+"""
+Exact-match cache for LLM responses to rendered prompt templates.
+
+Responses are keyed by a blake2b hash of the template name, its render arguments
+and any extra context that changes the LLM output (provider, model, human message),
+so repeated research steps with identical inputs skip the LLM call entirely.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+PROMPT_CACHE_MAX_SIZE = 256
+PROMPT_CACHE_TTL_SECONDS = 3600
+
+# key -> (expires_at, response), least recently used first
+_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+# Graph branches may run in worker threads
+_lock = threading.Lock()
+
+def make_key(template_name: str, kwargs: Dict[str, Any], context: Sequence[Any] = ()) -> str:
+    """Hash a template name, its render arguments and extra context into a cache key"""
+    payload = json.dumps(
+        [template_name, sorted(kwargs.items()), list(context)],
+        default=str,
+        ensure_ascii=False
+    )
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+def lookup(template_name: str, kwargs: Dict[str, Any], context: Sequence[Any] = ()) -> Optional[str]:
+    """Return the cached response for an identical prompt, or None"""
+    key = make_key(template_name, kwargs, context)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return response
+
+def store(template_name: str, kwargs: Dict[str, Any], response: str, context: Sequence[Any] = ()):
+    """Cache a response, evicting the least recently used entry when full"""
+    key = make_key(template_name, kwargs, context)
+    with _lock:
+        _cache[key] = (time.monotonic() + PROMPT_CACHE_TTL_SECONDS, response)
+        _cache.move_to_end(key)
+        while len(_cache) > PROMPT_CACHE_MAX_SIZE:
+            _cache.popitem(last=False)
+
+def clear():
+    """Drop every cached response"""
+    with _lock:
+        _cache.clear()
@@ -1,10 +1,27 @@
-from datetime import datetime
+import re
+import string
+import sys
+from datetime import date
+from functools import cache, lru_cache
 
-# Get current date in a readable format
+@lru_cache(maxsize=1)
+def _format_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime("%B %d, %Y")
+
+# Get current date in a readable format (formatted once per day)
 def get_current_date():
-    return datetime.now().strftime("%B %d, %Y")
+    return _format_date(date.today().toordinal())
+
+# Thai script anywhere (covers "ตอบเป็นภาษาไทย") or an explicit "in Thai" request
+_THAI_REQUEST_RE = re.compile(r"[\u0E00-\u0E7F]|\bin thai\b", re.IGNORECASE)
+
+# Decide the response language in Python once per topic instead of asking the LLM
+# to re-analyze the request on every summarizer and report call
+@lru_cache(maxsize=128)
+def detect_language(topic: str) -> str:
+    return "Thai" if _THAI_REQUEST_RE.search(topic) else "English"
 
-query_writer_instructions = """Your goal is to generate focused and relevant search queries that stay strictly within the scope of the original research topic. These queries are for an advanced automated research tool.
+query_writer_prefix = """Your goal is to generate focused and relevant search queries that stay strictly within the scope of the original research topic. These queries are for an advanced automated research tool.
 
 CRITICAL RULE: Always stay focused on the original research topic. Do not generate queries about unrelated topics or drift to tangential subjects.
 
@@ -23,17 +40,15 @@ CRITICAL FOR TECHNICAL PAPERS: When user provides academic URLs or asks for tech
 - Use technical terms from the relevant domain
 - Search for related academic work, not basic explanations
 
-Original Research Topic: {research_topic}
-
 Instructions:
-- STAY FOCUSED: Every query must directly relate to the original research topic above
+- STAY FOCUSED: Every query must directly relate to the original research topic given in the Context below
 - INCLUDE USER CONTEXT: Incorporate key terms and concepts from the original user query in your search queries
 - Always prefer a single search query, only add another query if the original question requests multiple aspects and one query is not enough
 - Each query should focus on one specific aspect of the ORIGINAL research topic
 - Don't produce more than 3 queries maximum
 - Queries should be diverse but all related to the same core topic
 - Don't generate multiple similar queries, 1 is enough per aspect
-- Query should ensure that the most current information is gathered. The current date is {current_date}
+- Query should ensure that the most current information is gathered. The current date is given in the Context below
 - Focus on web search queries for the best results
 - PRESERVE USER INTENT: Include specific terms, phrases, or concepts from the user's original query to maintain search relevance
 
@@ -102,18 +117,21 @@ QUERY GENERATION EXAMPLES:
 - Focus: Content appropriate for the target language and cultural context
 - Strategy: Use technical terms in the target language when appropriate
 
-IMPORTANT: Your queries must stay strictly within the scope of: {research_topic}
+IMPORTANT: Your queries must stay strictly within the scope of the research topic in the Context below."""
 
-Context: {research_topic}"""
+query_writer_suffix = """
 
-web_searcher_instructions = """Conduct targeted searches to gather the most recent (if the user mentioned), credible information on "{research_topic}" and synthesize it into a verifiable summary.
+Context: {research_topic}
+Date: {current_date}"""
 
-CRITICAL: Stay focused on the original research topic throughout the entire search process. Do not drift to unrelated subjects.
+query_writer_instructions = query_writer_prefix + query_writer_suffix
+
+web_searcher_prefix = """Conduct targeted searches to gather the most recent (if the user mentioned), credible information on the research topic given in the Context below and synthesize it into a verifiable summary.
 
-Original Research Topic: {research_topic}
+CRITICAL: Stay focused on the original research topic throughout the entire search process. Do not drift to unrelated subjects.
 
 Instructions:
-- Query should ensure that the most current information is gathered. The current date is {current_date}
+- Query should ensure that the most current information is gathered. The current date is given in the Context below
 - Conduct focused searches to gather comprehensive information about the ORIGINAL topic only
 - Consolidate key findings while meticulously tracking the source(s) for each specific piece of information
 - The output should be a well-written summary based on your search findings
@@ -121,14 +139,18 @@ Instructions:
 - Don't make up any information
 - If search results start going off-topic, refocus on the original research question
 
-SCOPE CONTROL: All information gathered must directly relate to: {research_topic}
+SCOPE CONTROL: All information gathered must directly relate to the research topic in the Context below."""
+
+web_searcher_suffix = """
 
-Research Topic:
-{research_topic}
+Context: {research_topic}
+Date: {current_date}
 """
 
+web_searcher_instructions = web_searcher_prefix + web_searcher_suffix
+
 
-summarizer_instructions = """You are Dean. You are a research scientist with expertise in creating comprehensive, high-quality research summaries that provide deep technical insights for report generation.
+summarizer_prefix = """You are Dean. You are a research scientist with expertise in creating comprehensive, high-quality research summaries that provide deep technical insights for report generation.
 
 <RESEARCH_SUMMARY_APPROACH>
 Create a comprehensive research summary that follows these principles:
@@ -144,10 +166,8 @@ Create a comprehensive research summary that follows these principles:
 Reference quality: Detailed Medium articles, comprehensive technical blogs, in-depth academic research reports
 </RESEARCH_SUMMARY_APPROACH>
 
-<LANGUAGE_AND_TONE_ANALYSIS>
-CRITICAL: Analyze the ORIGINAL user's research request to determine both language AND tone/complexity level:
-
-ORIGINAL USER REQUEST: {research_topic}
+<TONE_ANALYSIS>
+CRITICAL: Analyze the ORIGINAL user's research request (given in the Context below) to determine the tone/complexity level:
 
 Tone & Complexity Analysis:
 - "explain like I'm 15" / "simple" / "beginner" → Use simple language, analogies, step-by-step explanations
@@ -156,18 +176,7 @@ Tone & Complexity Analysis:
 - "professional analysis" / "business" → Use professional tone, focus on practical implications
 - "explain" / "what is" → Use educational tone with clear explanations
 - Default to balanced technical-accessible tone if no specific tone requested
-
-IMPORTANT: When writing in Thai:
-- Use proper Thai academic and technical vocabulary with detailed explanations
-- Provide comprehensive analogies and examples in Thai context (เปรียบเทียบและตัวอย่างในบริบทไทย)
-- Translate technical terms appropriately while maintaining accuracy (แปลศัพท์เทคนิคอย่างเหมาะสม)
-- Write in detailed, flowing Thai prose similar to high-quality Thai technical articles (เขียนเป็นภาษาไทยที่ลื่นและมีรายละเอียด)
-- Use step-by-step explanations and real-world Thai examples (ใช้การอธิบายทีละขั้นตอน)
-- Ensure cultural context is appropriate for Thai readers (เหมาะสมกับวัฒนธรรมไทย)
-- RESPECT the requested complexity level even in Thai (simple for beginners, technical for researchers)
-- Use formal Thai academic writing style for technical content (ใช้รูปแบบการเขียนทางวิชาการ)
-- Include Thai terminology alongside English when introducing new concepts
-</LANGUAGE_AND_TONE_ANALYSIS>
+</TONE_ANALYSIS>
 
 <SUMMARY_CONSTRUCTION_STRATEGY>
 Build your research summary through comprehensive paragraphs that cover:
@@ -201,7 +210,7 @@ When EXTENDING an existing summary:
     c. If it's not relevant to the user topic, skip it.                                                            
 4. Ensure all additions are relevant to the user's topic.                                                         
 5. Verify that your final output differs from the input summary.
-6. CRITICAL: Write in the language requested by the ORIGINAL user (Thai if requested, English by default)
+6. CRITICAL: Write in the target language given in the Context below
 7. CRITICAL: Match the tone and complexity level requested by the ORIGINAL user (simple for beginners, academic for researchers, etc.)
 </REQUIREMENTS>
 
@@ -212,7 +221,7 @@ When EXTENDING an existing summary:
 **Flow**: Connect ideas smoothly between paragraphs, building understanding progressively with clear transitions and explanations
 **Specificity**: Include concrete details, metrics, and examples where available - use real-world analogies and step-by-step breakdowns
 **Integration**: Synthesize information rather than just listing findings - provide deep analysis and implications
-**Language**: Write in the language requested by the ORIGINAL user (Thai if requested, English by default)
+**Language**: Write in the target language given in the Context below
 **Accessibility**: Make complex concepts understandable through analogies, examples, and detailed explanations
 **Comprehensiveness**: Provide extensive detail and avoid superficial treatment of topics
 **Source Attribution**: CRITICAL - Clearly indicate when information comes from sources vs. explanatory content. Use phrases like "according to [source]", "research shows", "based on the findings"
@@ -222,7 +231,7 @@ When EXTENDING an existing summary:
 <FORMATTING>
 - Start directly with the updated summary, without preamble or titles. Do not use XML tags in the output.
 - Write as flowing prose paragraphs, not bullet points
-- CRITICAL: Write the ENTIRE summary in the language requested by the ORIGINAL user
+- CRITICAL: Write the ENTIRE summary in the target language given in the Context below
 
 **TECHNICAL CONTENT FORMATTING:**
 - Use ```language blocks for code examples, algorithms, and technical implementations
@@ -236,16 +245,23 @@ When EXTENDING an existing summary:
 <Task>
 Think carefully about the provided Context first. Then generate a comprehensive research summary to address the research topic.
 
-CRITICAL: Write the ENTIRE summary in the language requested by the ORIGINAL user. Start directly with the research content.
-</Task>
+CRITICAL: Write the ENTIRE summary in the target language given in the Context below. Start directly with the research content.
+</Task>"""
+
+summarizer_suffix = """
+
+<CONTEXT>
+ORIGINAL USER REQUEST: {research_topic}
+Target Language: {target_language}
+{language_guidance}</CONTEXT>
 
 Begin your comprehensive research summary:"""
 
-reflection_instructions = """You are an expert research assistant analyzing summaries for research completion assessment.
+summarizer_instructions = summarizer_prefix + summarizer_suffix
 
-CRITICAL: Your task is to evaluate if the research summary adequately covers the user's original question about the research topic. Do not generate follow-up queries about unrelated subjects.
+reflection_prefix = """You are an expert research assistant analyzing summaries for research completion assessment.
 
-USER'S ORIGINAL RESEARCH QUESTION: {research_topic}
+CRITICAL: Your task is to evaluate if the research summary adequately covers the user's original question about the research topic. Do not generate follow-up queries about unrelated subjects.
 
 RESEARCH COMPLETION GUIDELINES:
 - Research should be marked as sufficient if the summary provides comprehensive coverage of the main aspects of the user's question
@@ -283,40 +299,24 @@ IMPORTANT:
 - Only continue research if there are ESSENTIAL gaps, not minor details
 - Err on the side of completion rather than continuation
 
-Reflect carefully on the Summaries to assess if they adequately address the user's research question. Then, produce your output following this JSON format:
+Reflect carefully on the Summaries to assess if they adequately address the user's research question. Then, produce your output following this JSON format:"""
+
+reflection_suffix = """
+
+USER'S ORIGINAL RESEARCH QUESTION: {research_topic}
 
 Summaries:
 {summaries}"""
 
-report_generation_instructions = """CRITICAL INSTRUCTION: Start your response IMMEDIATELY with the report title. 
+reflection_instructions = reflection_prefix + reflection_suffix
+
+report_generation_prefix = """CRITICAL INSTRUCTION: Start your response IMMEDIATELY with the report title. 
 - For English: Use H1 format (# Title)
 - For Thai: Use bold format (**รายงานการวิจัย: [Topic]**) - NO hashtag headers
 Do not include any explanations about your approach, meta-commentary, or preambles.
 
 You are an expert research analyst and technical writer tasked with creating comprehensive research reports and documents with full language support. Your writing style should be similar to high-quality Medium articles with detailed explanations, analogies, and step-by-step breakdowns.
 
-<LANGUAGE_DETECTION_AND_RESPONSE>
-CRITICAL: Analyze the user's research request to determine the requested language:
-
-USER RESEARCH REQUEST: {research_topic}
-
-**THAI REPORT TITLE FORMATTING**:
-- When writing in Thai, DO NOT use H1 header (#)
-- Instead, use bold text format: **รายงานการวิจัย: [Main Topic]**
-- Place the bold title at the beginning without any header syntax
-- Use proper Thai academic vocabulary for title construction
-
-IMPORTANT: When writing in Thai:
-- Write in detailed, flowing Thai prose similar to high-quality Thai technical articles (เขียนเป็นภาษาไทยที่ลื่นและมีรายละเอียด)
-- Use analogies and examples relevant to Thai context (ใช้การเปรียบเทียบและตัวอย่างในบริบทไทย)
-- Provide step-by-step explanations and comprehensive detail (อธิบายทีละขั้นตอนอย่างละเอียด)
-- Use formal Thai academic writing style for technical content (ใช้รูปแบบการเขียนทางวิชาการอย่างเป็นทางการ)
-- Include Thai terminology alongside English when introducing new concepts (ระบุคำศัพท์ไทยคู่กับภาษาอังกฤษ)
-- Use appropriate Thai academic section headers: บทสรุปโดยละเอียด, ผลการวิจัยหลัก, รายละเอียดเทคนิค, ข้อเสนอแนะ, วิธีการวิจัย, แหล่งอ้างอิง
-- **CRITICAL THAI FORMATTING**: ALWAYS add two empty lines between major sections when writing in Thai
-- **CRITICAL THAI SPACING**: After each ## header, add TWO line breaks before content starts
-</LANGUAGE_DETECTION_AND_RESPONSE>
-
 <GOAL>
 Generate a well-structured, professional research report about the research topic that synthesizes information from multiple sources into a coherent, actionable document. The report should serve as a definitive reference document on the research topic.
 </GOAL>
@@ -328,7 +328,7 @@ Generate a well-structured, professional research report about the research topi
 4. **Comprehensive Coverage**: Address all major aspects discovered during research, including technical details, current developments, and future implications with extensive analysis
 5. **Academic Rigor**: Maintain objectivity while clearly indicating confidence levels of different claims with detailed reasoning
 6. **Practical Utility**: Structure information to be immediately useful for decision-making and further research with step-by-step explanations
-7. **Language Accuracy**: Write in the language requested by the user with proper academic terminology and comprehensive explanations
+7. **Language Accuracy**: Write in the target language given in the Context below with proper academic terminology and comprehensive explanations
 8. **Detailed Explanations**: Use analogies, examples, and step-by-step breakdowns to make complex concepts accessible
 9. **Comprehensive Length**: Prioritize thoroughness over brevity - aim for detailed, comprehensive coverage (1500-3000 words)
 10. **Engaging Style**: Write in an engaging, accessible manner similar to high-quality Medium articles while maintaining academic rigor
@@ -361,24 +361,13 @@ IMPORTANT FORMATTING GUIDELINES:
 - Ensure proper source attribution throughout the document
 - Write in an engaging, accessible style similar to high-quality Medium articles
 - Provide extensive detail and comprehensive coverage of all aspects
-- CRITICAL: Write the ENTIRE report in the language requested by the user
-
-**THAI TITLE FORMATTING REQUIREMENTS**:
-- Thai reports MUST NOT use H1 headers (#)
-- Use bold text format: **รายงานการวิจัย: [Thai Title Text]**
-- Example: **รายงานการวิจัย: [Research Topic in Thai]**
-- Ensure proper Thai typography and academic terminology
+- CRITICAL: Write the ENTIRE report in the target language given in the Context below
 
 The final document should read as a professional research report suitable for academic, business, or technical audiences, with the depth and accessibility of high-quality Medium articles that provide comprehensive understanding through detailed explanations, analogies, and real-world examples.
 
 Focus specifically on the research topic findings and analysis.
 </REQUIREMENTS>
 
-<CONTEXT>
-Current Date: {current_date}
-Research Loops Completed: {research_loop_count}
-</CONTEXT>
-
 <TASK>
 CRITICAL: Start your response IMMEDIATELY with the report title. Do not include any preamble, explanations about your approach, or meta-commentary about the task.
 
@@ -386,9 +375,63 @@ Create a comprehensive research report about the research topic that synthesizes
 
 For English reports, begin directly with: # [Report Title]
 For Thai reports, begin directly with: **รายงานการวิจัย: [Report Title]**
-</TASK>
+</TASK>"""
+
+report_generation_suffix = """
+
+<CONTEXT>
+Research Topic: {research_topic}
+Current Date: {current_date}
+Research Loops Completed: {research_loop_count}
+Target Language: {target_language}
+{language_guidance}</CONTEXT>
 """
 
+report_generation_instructions = report_generation_prefix + report_generation_suffix
+
+# Language-specific writing rules, included only when the topic asks for that language
+_SUMMARY_LANGUAGE_GUIDANCE = {
+    "Thai": """IMPORTANT: When writing in Thai:
+- Use proper Thai academic and technical vocabulary with detailed explanations
+- Provide comprehensive analogies and examples in Thai context (เปรียบเทียบและตัวอย่างในบริบทไทย)
+- Translate technical terms appropriately while maintaining accuracy (แปลศัพท์เทคนิคอย่างเหมาะสม)
+- Write in detailed, flowing Thai prose similar to high-quality Thai technical articles (เขียนเป็นภาษาไทยที่ลื่นและมีรายละเอียด)
+- Use step-by-step explanations and real-world Thai examples (ใช้การอธิบายทีละขั้นตอน)
+- Ensure cultural context is appropriate for Thai readers (เหมาะสมกับวัฒนธรรมไทย)
+- RESPECT the requested complexity level even in Thai (simple for beginners, technical for researchers)
+- Use formal Thai academic writing style for technical content (ใช้รูปแบบการเขียนทางวิชาการ)
+- Include Thai terminology alongside English when introducing new concepts
+""",
+}
+
+_REPORT_LANGUAGE_GUIDANCE = {
+    "Thai": """**THAI REPORT TITLE FORMATTING**:
+- When writing in Thai, DO NOT use H1 header (#)
+- Instead, use bold text format: **รายงานการวิจัย: [Main Topic]**
+- Place the bold title at the beginning without any header syntax
+- Use proper Thai academic vocabulary for title construction
+
+IMPORTANT: When writing in Thai:
+- Write in detailed, flowing Thai prose similar to high-quality Thai technical articles (เขียนเป็นภาษาไทยที่ลื่นและมีรายละเอียด)
+- Use analogies and examples relevant to Thai context (ใช้การเปรียบเทียบและตัวอย่างในบริบทไทย)
+- Provide step-by-step explanations and comprehensive detail (อธิบายทีละขั้นตอนอย่างละเอียด)
+- Use formal Thai academic writing style for technical content (ใช้รูปแบบการเขียนทางวิชาการอย่างเป็นทางการ)
+- Include Thai terminology alongside English when introducing new concepts (ระบุคำศัพท์ไทยคู่กับภาษาอังกฤษ)
+- Use appropriate Thai academic section headers: บทสรุปโดยละเอียด, ผลการวิจัยหลัก, รายละเอียดเทคนิค, ข้อเสนอแนะ, วิธีการวิจัย, แหล่งอ้างอิง
+- **CRITICAL THAI FORMATTING**: ALWAYS add two empty lines between major sections when writing in Thai
+- **CRITICAL THAI SPACING**: After each ## header, add TWO line breaks before content starts
+""",
+}
+
+_LANGUAGE_GUIDANCE = {
+    "summarizer": _SUMMARY_LANGUAGE_GUIDANCE,
+    "report_generation": _REPORT_LANGUAGE_GUIDANCE,
+}
+
+def language_guidance(name, target_language):
+    """Return the extra writing rules for a template in the target language, if any"""
+    return _LANGUAGE_GUIDANCE.get(name, {}).get(target_language, "")
+
 chain_of_verification_instructions = """You are an expert research quality analyst tasked with generating verification questions to ensure research relevance, source quality, and summary accuracy.
 
 <GOAL>
@@ -532,3 +575,95 @@ Based on the original research summary and verification results provided, create
 4. Includes missing information crucial to answering the user's question
 5. Provides a more comprehensive and reliable response to the user's needs
 </TASK>"""
+
+# Templates pre-parsed into (literal, field_name) parts, so rendering is a join
+# instead of str.format re-scanning several KB of prompt text on every call
+_FORMATTER = string.Formatter()
+
+_TEMPLATES = {
+    "query_writer": query_writer_instructions,
+    "web_searcher": web_searcher_instructions,
+    "summarizer": summarizer_instructions,
+    "reflection": reflection_instructions,
+    "report_generation": report_generation_instructions,
+    "chain_of_verification": chain_of_verification_instructions,
+    "verification_synthesis": verification_synthesis_instructions,
+}
+
+def _compile(template):
+    parts = []
+    # parse() already unescapes {{ and }} but splits the literal text at each one;
+    # merge the pieces so every JSON example becomes a single pre-built chunk
+    pending = []
+    for literal, field_name, format_spec, conversion in _FORMATTER.parse(template):
+        if format_spec or conversion:
+            raise ValueError(f"Unsupported prompt field: {{{field_name}!{conversion}:{format_spec}}}")
+        pending.append(literal)
+        if field_name is not None:
+            # Interned like the keyword-argument names they are looked up with
+            parts.append(("".join(pending), sys.intern(field_name)))
+            pending = []
+    if pending:
+        parts.append(("".join(pending), None))
+    return tuple(parts)
+
+# Parsed on first render, so a process only pays for the templates it uses
+@cache
+def _compiled(name):
+    return _compile(_TEMPLATES[name])
+
+# Per-day specialization: {current_date} is constant for a whole run, so it is
+# substituted once into the compiled parts instead of on every render
+@lru_cache(maxsize=32)
+def _compiled_for_date(name, ordinal):
+    current_date = _format_date(ordinal)
+    parts = []
+    pending = []
+    for literal, field_name in _compiled(name):
+        pending.append(literal)
+        if field_name == "current_date":
+            pending.append(current_date)
+        elif field_name is not None:
+            parts.append(("".join(pending), field_name))
+            pending = []
+    if pending:
+        parts.append(("".join(pending), None))
+    return tuple(parts)
+
+def render(name, **kwargs):
+    """Render a prompt by name; equivalent to <name>_instructions.format(**kwargs)
+    
+    current_date defaults to today's date (see get_current_date) when not given.
+    """
+    if "current_date" in kwargs:
+        parts = _compiled(name)
+    else:
+        parts = _compiled_for_date(name, date.today().toordinal())
+    # Convert each value once, even when a field appears several times in a template
+    values = {key: str(value) for key, value in kwargs.items()}
+    return "".join(
+        literal if field_name is None else literal + values[field_name]
+        for literal, field_name in parts
+    )
+
+_PREFIXES = {
+    "query_writer": query_writer_prefix,
+    "web_searcher": web_searcher_prefix,
+    "summarizer": summarizer_prefix,
+    "reflection": reflection_prefix,
+    "report_generation": report_generation_prefix,
+}
+
+@cache
+def _rendered_prefix(name):
+    # Prefixes have no fields, only escaped braces
+    return "".join(literal for literal, _ in _compile(_PREFIXES[name]))
+
+def build_prompt(name, **kwargs):
+    """Render a prompt by name as a (static prefix, variable suffix) pair.
+    
+    The prefix is byte-identical across calls, so it can be marked for provider-side
+    prompt caching (e.g. Anthropic cache_control); prefix + suffix == render(name, **kwargs).
+    """
+    prefix = _rendered_prefix(name)
+    return prefix, render(name, **kwargs)[len(prefix):]
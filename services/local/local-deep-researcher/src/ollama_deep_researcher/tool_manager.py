@@ -24,6 +24,7 @@ try:
     from .openwebui_integration import (
         openwebui_integration,
         register_arxiv_mcp_server,
+        CONNECTION_ERRORS as OPENWEBUI_CONNECTION_ERRORS,
         get_available_tools as get_openwebui_tools,
         get_tool_specs_for_llm as get_openwebui_specs,
         execute_tool as execute_openwebui_tool
@@ -33,6 +34,7 @@ except ImportError:
     from openwebui_integration import (
         openwebui_integration,
         register_arxiv_mcp_server,
+        CONNECTION_ERRORS as OPENWEBUI_CONNECTION_ERRORS,
         get_available_tools as get_openwebui_tools,
         get_tool_specs_for_llm as get_openwebui_specs,
         execute_tool as execute_openwebui_tool
@@ -310,19 +312,14 @@ class ToolManager:
                         result=result,
                         execution_time=execution_time
                     )
-                except RuntimeError as e:
-                    error_msg = str(e).lower()
-                    if any(keyword in error_msg for keyword in ["event loop", "cannot write", "connection", "closed"]):
-                        logger.warning(f"Skipping {tool_name} execution - event loop/connection issue: {str(e)}")
-                        return ToolExecution(
-                            success=False,
-                            result=None,
-                            error=f"Event loop/connection issue - skipping execution: {str(e)}",
-                            execution_time=time.time() - start_time
-                        )
-                    else:
-                        logger.error(f"OpenWebUI tool execution failed: {str(e)}")
-                        # Continue to local tool execution error
+                except OPENWEBUI_CONNECTION_ERRORS as e:
+                    logger.warning(f"Skipping {tool_name} execution - connection issue: {str(e)}")
+                    return ToolExecution(
+                        success=False,
+                        result=None,
+                        error=f"Connection issue - skipping execution: {str(e)}",
+                        execution_time=time.time() - start_time
+                    )
                 except Exception as e:
                     logger.error(f"OpenWebUI tool execution failed: {str(e)}")
                     # Continue to local tool execution error
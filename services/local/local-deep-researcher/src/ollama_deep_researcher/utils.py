@@ -5,6 +5,7 @@ import aiohttp
 import asyncio
 import urllib.parse
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Union, Optional
 from bs4 import BeautifulSoup
 
@@ -570,3 +571,45 @@ def parallel_search_coordinator(
         print(f"Search coordination failed: {str(e)}")
         # Fallback to web search
         return web_search_only(query, max_results, fetch_full_page)
+
+# Queries searched concurrently per batch; query writer and verification emit at most 3
+SEARCH_BATCH_SIZE = 3
+
+def parallel_search_queries(
+    queries: List[str],
+    search_strategy: str = "web_search",
+    max_results: int = 8,
+    fetch_full_page: bool = False,
+    mcp_server_url: str = "http://192.168.19.61:9937"
+) -> List[Optional[Dict[str, List[Dict[str, Any]]]]]:
+    """
+    Run parallel_search_coordinator for several queries concurrently.
+    
+    Searches are blocking (and MCP search drives its own event loop), so they run
+    on a thread pool in batches of at most SEARCH_BATCH_SIZE queries.
+    
+    Args:
+        queries (List[str]): Search queries
+        search_strategy (str): Search strategy ("web_search" or "mcp")
+        max_results (int): Maximum results to return per query
+        fetch_full_page (bool): Whether to fetch full page content
+        mcp_server_url (str): MCP server URL for ArXiv search
+        
+    Returns:
+        List of search results in query order, with None for queries whose search failed
+    """
+    def search(query: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        try:
+            return parallel_search_coordinator(query, search_strategy, max_results, fetch_full_page, mcp_server_url)
+        except Exception as e:
+            print(f"Search failed for query '{query}': {str(e)}")
+            return None
+    
+    if len(queries) == 1:
+        return [search(queries[0])]
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=SEARCH_BATCH_SIZE) as executor:
+        for start in range(0, len(queries), SEARCH_BATCH_SIZE):
+            results.extend(executor.map(search, queries[start:start + SEARCH_BATCH_SIZE]))
+    return results